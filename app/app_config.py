@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import Literal
+from typing import Literal, Optional
 from pathlib import Path
 
 class Settings(BaseSettings):
@@ -14,10 +14,44 @@ class Settings(BaseSettings):
     TEMPERATURE: float = 0.2
     MAX_TOKENS: int = 1024
     provider: Literal["groq", "openai"] = "groq"
+    # Override to point the SDK clients at a compatible server (e.g. the benchmark stub)
+    GROQ_BASE_URL: Optional[str] = None
+    OPENAI_BASE_URL: Optional[str] = None
 
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
 
+    INDEX_TYPE: Literal["flat", "hnsw"] = "flat"
+    HNSW_M: int = 32
+    HNSW_EF_SEARCH: int = 64
+    INDEX_CACHE_SIZE: int = 32
+    INDEX_ROOT: Path = Path("vector_indexes")
+    INDEX_MMAP: bool = True
+
+    # On-disk caches shared by all workers
+    CACHE_DIR: Path = Path("cache")
+    EMBEDDING_CACHE: bool = True
+    ANSWER_CACHE: bool = True
+
+    # "adaptive" over-fetches once, then cuts at a score gap/threshold and a token budget
+    RETRIEVAL_MODE: Literal["fixed", "adaptive"] = "adaptive"
+    ADAPTIVE_FETCH_K: int = 20
+    ADAPTIVE_MIN_K: int = 1
+    ADAPTIVE_MAX_K: int = 10
+    ADAPTIVE_MIN_SCORE: float = 0.5
+    ADAPTIVE_MAX_GAP: float = 0.08
+    ADAPTIVE_TOP_MARGIN: float = 0.15
+    CONTEXT_TOKEN_BUDGET: int = 4000
+    QUERY_EXPANSION_CACHE_SIZE: int = 2048
+    MAP_REDUCE_WORKERS: int = 8
+
+    INGEST_MAX_WORKERS: int = 4
+    EMBED_BATCH_SIZE: int = 64
+
+    OCR_MIN_PAGE_CHARS: int = 20
+    OCR_DPI: int = 300
+    OCR_MAX_WORKERS: int = 4
+
     DEBUG: bool = True
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "DEBUG"
     HOST: str = "0.0.0.0"
@@ -25,6 +59,29 @@ class Settings(BaseSettings):
     USE_PINECONE: bool = False
 
     UPLOAD_DIR: Path = Path("temp_docs")
+    UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    UPLOAD_MAX_BATCH_BYTES: int = 500 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+
+    # Remote document downloads (HackRx): pooled client, size cap, conditional-GET cache
+    FETCH_CACHE_DIR: Path = Path("cache/http")
+    FETCH_MAX_BYTES: int = 100 * 1024 * 1024
+    FETCH_TIMEOUT_SECONDS: float = 60.0
+    FETCH_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    FETCH_MAX_CONNECTIONS: int = 20
+
+    # Disk janitor: TTL first, then LRU eviction down to the quota (0 interval disables)
+    JANITOR_INTERVAL_SECONDS: int = 600
+    UPLOAD_TTL_SECONDS: int = 24 * 3600
+    UPLOAD_QUOTA_BYTES: int = 2 * 1024 ** 3
+    INDEX_TTL_SECONDS: int = 7 * 24 * 3600
+    INDEX_QUOTA_BYTES: int = 5 * 1024 ** 3
+    CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    CACHE_QUOTA_BYTES: int = 1024 ** 3
+
+    # Opt-in capture of HackRx payloads + retrieved chunk IDs for offline replay
+    CAPTURE_REQUESTS: bool = False
+    CAPTURE_PATH: Path = Path("captures/requests.jsonl")
 
     @field_validator("UPLOAD_DIR", mode="before")
     @classmethod
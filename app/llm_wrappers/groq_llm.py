@@ -1,5 +1,6 @@
 from openai import OpenAI
 from app.app_config import settings
+from app.utils.metrics import observe_stage, record_llm_usage
 from typing import List, Dict, Union
 import time
 import logging
@@ -7,7 +8,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 client = OpenAI(
-    base_url="https://api.groq.com/openai/v1",
+    base_url=f"{(settings.GROQ_BASE_URL or 'https://api.groq.com').rstrip('/')}/openai/v1",
     api_key=settings.GROQ_API_KEY,
 )
 
@@ -51,6 +52,8 @@ def generate_answer(
             max_tokens=max_tokens
         )
         duration = time.time() - start
+        observe_stage("llm", duration)
+        record_llm_usage("groq", model, response.usage)
         logger.info(
             f"[LLM Success] Model={model} Tokens={response.usage.total_tokens} Time={duration:.2f}s"
         )
@@ -59,5 +62,6 @@ def generate_answer(
     try:
         return retry_call(call)
     except Exception as e:
+        record_llm_usage("groq", model, None, status="error")
         logger.error(f"[LLM Error] {e}")
         return f"[LLM Error] {str(e)}"
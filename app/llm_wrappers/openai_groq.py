@@ -1,48 +1,84 @@
 # app/llm_wrappers/openai_groq.py
 import os
+import logging
+from typing import Dict, List, Optional
 from app.app_config import settings
+from app.utils.metrics import stage_timer, record_llm_usage
 from openai import OpenAI
 from groq import Groq
 
+logger = logging.getLogger(__name__)
+
 OPENAI_API_KEY = settings.OPENAI_API_KEY
 GROQ_API_KEY = settings.GROQ_API_KEY
 
 # Clients
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+openai_client = OpenAI(api_key=OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL) if OPENAI_API_KEY else None
+groq_client = Groq(api_key=GROQ_API_KEY, base_url=settings.GROQ_BASE_URL) if GROQ_API_KEY else None
+
+def _messages(prompt: str, system: Optional[str]) -> List[Dict[str, str]]:
+    # A stable system message first lets providers reuse the cached prefix
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def _record_usage(provider: str, model: str, usage):
+    cached = record_llm_usage(provider, model, usage)
+    if usage is not None:
+        logger.debug(
+            f"[LLM] {provider}/{model}: prompt_tokens={getattr(usage, 'prompt_tokens', 0)} cached_tokens={cached}"
+        )
 
-def get_llm_response(prompt: str, provider: str = "groq", model: str = None, temperature: float = 0.1, max_tokens: int = 512) -> str:
+def get_llm_response(
+    prompt: str,
+    provider: str = "groq",
+    model: str = None,
+    temperature: float = 0.1,
+    max_tokens: int = 512,
+    system: Optional[str] = None,
+) -> str:
     """
     Get a text completion from Groq or OpenAI based on the provider.
+    `system`, if given, is sent as a system message ahead of the prompt.
     """
     provider = provider.lower()
+    messages = _messages(prompt, system)
 
     if provider == "groq":
         if not groq_client:
             raise ValueError("GROQ_API_KEY not found in environment.")
         model = model or settings.GROQ_MODEL_NAME
-        print(f"Using GROQ model: {model}")  # ← ADD THIS LINE
+        logger.debug(f"Using GROQ model: {model}")
         try:
-            response = groq_client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
+            with stage_timer("llm"):
+                response = groq_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            _record_usage(provider, model, response.usage)
             return response.choices[0].message.content.strip()
         except Exception as e:
+            record_llm_usage(provider, model, None, status="error")
             return f"[Error generating answer: {str(e)}]"
 
     elif provider == "openai":
         if not openai_client:
             raise ValueError("OPENAI_API_KEY not found in environment.")
         model = model or "gpt-3.5-turbo"
-        response = openai_client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
+        try:
+            with stage_timer("llm"):
+                response = openai_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+        except Exception:
+            record_llm_usage(provider, model, None, status="error")
+            raise
+        _record_usage(provider, model, response.usage)
         return response.choices[0].message.content.strip()
 
     else:
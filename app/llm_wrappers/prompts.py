@@ -0,0 +1,169 @@
+from typing import NamedTuple
+
+
+class ChatPrompt(NamedTuple):
+    """
+    A prompt split for provider-side prefix caching: `system` holds everything
+    shared by questions over the same context (instructions, then context);
+    `user` holds only the question.
+    """
+    system: str
+    user: str
+
+
+REFINE_INSTRUCTIONS = """
+You are an expert insurance policy analyst.
+
+Use the following CONTEXT from a health insurance policy to answer the QUESTION.
+
+Instructions:
+- Base your answer strictly on the provided context.
+- Do not include generic disclaimers.
+- If the answer is uncertain, say so clearly.
+- Use bullet points if multiple points are found.
+- Be concise, clear, and informative.
+""".strip()
+
+EXPERT_INSTRUCTIONS = """
+You are an insurance policy expert.
+Use the provided context to give a clear, complete, and user-friendly answer to the question.
+Please give a detailed but concise answer without unnecessary repetition.
+""".strip()
+
+
+def refine_prompt(question: str, context: str) -> str:
+    """
+    Refine-style prompt designed for accurate and specific insurance-related answers.
+    """
+    return f"""
+{REFINE_INSTRUCTIONS}
+
+CONTEXT:
+\"\"\"
+{context}
+\"\"\"
+
+QUESTION: {question}
+
+ANSWER:
+""".strip()
+
+
+def refine_chat_prompt(question: str, context: str) -> ChatPrompt:
+    """
+    refine_prompt as a cacheable system prefix plus a question-only user message.
+    """
+    return ChatPrompt(
+        system=f'{REFINE_INSTRUCTIONS}\n\nCONTEXT:\n"""\n{context}\n"""',
+        user=f"QUESTION: {question}\n\nANSWER:",
+    )
+
+
+def expert_prompt(question: str, context: str) -> str:
+    """
+    User-friendly insurance expert prompt (originally the GPT-3.5 path).
+    """
+    return f"""
+You are an insurance policy expert.
+Use the provided context to give a clear, complete, and user-friendly answer to the question.
+
+Context:
+\"\"\"
+{context}
+\"\"\"
+
+Question: {question}
+
+Please give a detailed but concise answer without unnecessary repetition.
+"""
+
+
+def expert_chat_prompt(question: str, context: str) -> ChatPrompt:
+    """
+    expert_prompt as a cacheable system prefix plus a question-only user message.
+    """
+    return ChatPrompt(
+        system=f'{EXPERT_INSTRUCTIONS}\n\nContext:\n"""\n{context}\n"""',
+        user=f"Question: {question}",
+    )
+
+
+def standard_prompt(question: str, context: str) -> str:
+    """
+    Generic context-only QA prompt used by the RAG and refine strategies.
+    """
+    return f"""
+You are a helpful assistant. Use ONLY the following context to answer the question.
+If you don't know the answer, say "I don't know".
+
+Question: {question}
+
+Context:
+{context}
+
+Answer with complete explanation:
+""".strip()
+
+
+def refine_step_prompt(question: str, existing_answer: str, context: str) -> str:
+    """
+    Follow-up prompt that folds one more chunk into an existing answer.
+    """
+    return f"""
+You are refining an answer based on new context.
+
+Existing Answer:
+{existing_answer}
+
+Additional Context:
+{context}
+
+Refine the answer if helpful. Otherwise, repeat the existing answer.
+""".strip()
+
+
+def multi_query_prompt(question: str, count: int = 3) -> str:
+    """
+    Asks the LLM for alternative phrasings of a question to widen retrieval.
+    """
+    return f"""
+You are an AI language model assistant. Your task is to generate {count}
+different versions of the given user question to retrieve relevant documents
+from a vector database. Provide these alternative questions separated by newlines.
+Original question: {question}
+""".strip()
+
+
+def map_prompt(question: str, context: str) -> str:
+    """
+    Map step: pull only what one chunk says about the question.
+    """
+    return f"""
+Extract every statement from the CONTEXT that helps answer the QUESTION.
+Quote figures, limits and conditions exactly. If nothing is relevant, reply NONE.
+
+CONTEXT:
+\"\"\"
+{context}
+\"\"\"
+
+QUESTION: {question}
+""".strip()
+
+
+def reduce_prompt(question: str, notes: str) -> str:
+    """
+    Reduce step: answer from the notes collected by the map step.
+    """
+    return f"""
+You are an expert insurance policy analyst.
+Answer the QUESTION using only the NOTES extracted from the policy document.
+If the notes do not contain the answer, say "I don't know".
+
+NOTES:
+{notes}
+
+QUESTION: {question}
+
+ANSWER:
+""".strip()
@@ -1,70 +1,57 @@
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any
 from app.app_config import settings
 from app.models.schema import SourceChunk
+from app.retrieval.chunk_store import RetrievedChunk
 
 from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQAWithSourcesChain, RefineDocumentsChain
 from langchain_core.runnables import RunnableConfig
 from langchain_core.output_parsers import StrOutputParser
 
-from langchain.vectorstores.faiss import FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.retrievers.multi_query import MultiQueryRetriever
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
 
-from app.retrieval.embedding_engine import load_faiss_index
+from app.llm_wrappers.prompts import refine_step_prompt, standard_prompt
+from app.retrieval.pipeline import get_pipeline
 
 
 # === LLM Loader ===
-def get_llm():
-    if settings.provider == "groq":
+@lru_cache(maxsize=None)
+def get_llm(provider: str = settings.provider):
+    """
+    Returns a shared chat model per provider instead of building one per call.
+    """
+    if provider == "groq":
         return ChatGroq(
             api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
             model=settings.GROQ_MODEL_NAME,
             temperature=settings.TEMPERATURE,
             max_tokens=settings.MAX_TOKENS
         )
-    elif settings.provider == "openai":
+    elif provider == "openai":
         return ChatOpenAI(
             api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
             model=settings.OPENAI_MODEL_NAME,
             temperature=settings.TEMPERATURE,
             max_tokens=settings.MAX_TOKENS
         )
     else:
-        raise ValueError(f"Unsupported provider: {settings.provider}")
+        raise ValueError(f"Unsupported provider: {provider}")
 
 
-# === Prompt Template ===
+# === Prompt Templates ===
+# Built from the shared prompt builders in prompts.py so the LangChain path
+# and the pipelines never drift apart.
 STANDARD_PROMPT_TEMPLATE = PromptTemplate(
     input_variables=["question", "context"],
-    template="""
-You are a helpful assistant. Use ONLY the following context to answer the question.
-If you don't know the answer, say "I don't know".
-
-Question: {question}
-
-Context:
-{context}
-
-Answer with complete explanation:
-""".strip()
+    template=standard_prompt("{question}", "{context}"),
 )
 
 REFINE_PROMPT = PromptTemplate(
     input_variables=["question", "existing_answer", "context"],
-    template="""
-You are refining an answer based on new context.
-
-Existing Answer:
-{existing_answer}
-
-Additional Context:
-{context}
-
-Refine the answer if helpful. Otherwise, repeat the existing answer.
-""".strip()
+    template=refine_step_prompt("{question}", "{existing_answer}", "{context}"),
 )
 
 
@@ -88,34 +75,22 @@ def get_answer(question: str, chunks: List[SourceChunk]) -> Tuple[str, str]:
         return f"[Error] {str(e)}", "Chain execution failed."
 
 
-# === RAG + MultiQuery Retriever + Source Trace ===
-def get_answer_rag(question: str, index_name: str) -> Dict[str, Any]:
-    try:
-        # Load FAISS vector store with metadata
-        vectorstore = load_faiss_index(index_name)
-        retriever = MultiQueryRetriever.from_llm(
-            retriever=vectorstore.as_retriever(search_type="similarity", k=6),
-            llm=get_llm()
-        )
-
-        chain = RetrievalQAWithSourcesChain.from_chain_type(
-            llm=get_llm(),
-            retriever=retriever,
-            chain_type="stuff",
-            return_source_documents=True,
-            verbose=settings.DEBUG
-        )
+def _source_labels(chunks: List[RetrievedChunk]) -> List[str]:
+    labels = []
+    for chunk in chunks:
+        source = chunk.source or "Unknown"
+        labels.append(f"{source} (Page {chunk.page})" if chunk.page else source)
+    return labels
 
-        result = chain.invoke({"question": question})
-        sources = []
 
-        for doc in result.get("source_documents", []):
-            source_info = doc.metadata.get("source", "Unknown")
-            page = doc.metadata.get("page", None)
-            sources.append(f"{source_info} (Page {page})" if page else source_info)
+# === RAG + Local Multi-Query Retrieval + Source Trace ===
+def get_answer_rag(question: str, index_name: str) -> Dict[str, Any]:
+    try:
+        result = get_pipeline("rag").run([question], index_name=index_name)
+        sources = _source_labels(result.sources[0])
 
         return {
-            "answer": result["answer"].strip(),
+            "answer": result.answers[0].strip(),
             "rationale": f"Multi-query RAG used with {len(sources)} retrieved chunks.",
             "sources": list(set(sources)) or ["Not available"]
         }
@@ -131,28 +106,11 @@ def get_answer_rag(question: str, index_name: str) -> Dict[str, Any]:
 # === Refine-based RAG for longer/more nuanced answers ===
 def get_answer_refine_rag(question: str, index_name: str) -> Dict[str, Any]:
     try:
-        vectorstore = load_faiss_index(index_name)
-        retriever = vectorstore.as_retriever(search_type="similarity", k=10)
-
-        llm = get_llm()
-        chain = RefineDocumentsChain.from_llm(
-            llm=llm,
-            question_prompt=STANDARD_PROMPT_TEMPLATE,
-            refine_prompt=REFINE_PROMPT,
-            document_variable_name="context",
-            return_intermediate_steps=False
-        )
-
-        docs = retriever.get_relevant_documents(question)
-
-        answer = chain.invoke({"question": question, "context": docs})
-        sources = [
-            f"{doc.metadata.get('source', 'Unknown')} (Page {doc.metadata.get('page')})"
-            for doc in docs
-        ]
+        result = get_pipeline("refine").run([question], index_name=index_name)
+        sources = _source_labels(result.sources[0])
 
         return {
-            "answer": answer.strip(),
+            "answer": result.answers[0].strip(),
             "rationale": f"Refine-based RAG using {len(sources)} refined chunks.",
             "sources": list(set(sources)) or ["Not available"]
         }
@@ -163,3 +121,23 @@ def get_answer_refine_rag(question: str, index_name: str) -> Dict[str, Any]:
             "rationale": "Refine chain failed.",
             "sources": []
         }
+
+
+# === Map-reduce RAG: concurrent per-chunk extraction + one reduce call ===
+def get_answer_map_reduce_rag(question: str, index_name: str) -> Dict[str, Any]:
+    try:
+        result = get_pipeline("map_reduce").run([question], index_name=index_name)
+        sources = _source_labels(result.sources[0])
+
+        return {
+            "answer": result.answers[0].strip(),
+            "rationale": f"Map-reduce RAG over {len(sources)} chunks in {result.llm_calls} LLM calls.",
+            "sources": list(set(sources)) or ["Not available"]
+        }
+
+    except Exception as e:
+        return {
+            "answer": f"[Map-Reduce Error] {str(e)}",
+            "rationale": "Map-reduce chain failed.",
+            "sources": []
+        }
@@ -1,20 +1,48 @@
 from fastapi import FastAPI, UploadFile, Depends, File, Form, Header, HTTPException, status
+from fastapi import Request, Response
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 import os
 import uuid
+import time
+import asyncio
 import logging
 
 from app.app_config import settings
 from app.parsers.file_parser import parse_document
-from app.retrieval.embedding_engine import index_document
+from app.parsers.batch_parser import parse_documents_parallel, extract_zip, shutdown_parse_pool, unique_path
+from app.retrieval.embedding_engine import (
+    content_index_name,
+    get_embedding_model,
+    index_document,
+    index_exists,
+    resolve_index_name,
+    write_index_alias,
+)
 from app.retrieval.search_engine import answer_questions
-from app.models.schema import AnswerResponse, UploadResponse
-from app.utils.download_and_parse import download_and_parse_pdf
+from app.retrieval.pipeline import PIPELINES, cache_index, get_index, get_pipeline
+from app.retrieval.chunk_store import to_source_chunks
+from app.models.schema import AnswerResponse, UploadResponse, BatchUploadResponse, BatchFileResult
+from app.utils.download_and_parse import parse_pdf_file
+from app.utils.http_fetcher import DocumentTooLarge, fetcher
+from app.utils.request_capture import capture_hackrx, recorder
+from app.utils.uploads import UploadSizeLimitMiddleware, UploadTooLarge, stream_upload_to_disk
+from app.utils.janitor import janitor_loop
+from app.utils.metrics import (
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    add_server_timing,
+    begin_request_timing,
+    end_request_timing,
+    mark_process_dead,
+    render_metrics,
+    stage_timer,
+)
 
 # === Logging Setup ===
 logger = logging.getLogger("docqa")
@@ -33,10 +61,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# === Metrics & Server-Timing ===
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    token = begin_request_timing()
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        HTTP_LATENCY.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status_code)
+        ).observe(elapsed)
+        server_timing = end_request_timing(token)
+
+    total = f"total;dur={elapsed * 1000:.1f}"
+    response.headers["Server-Timing"] = f"{server_timing}, {total}" if server_timing else total
+    return response
+
+# === Upload Size Guard ===
+# Caps request bodies by Content-Length and by bytes actually received, before
+# the multipart parser spools them; stream_upload_to_disk caps each file again.
+UPLOAD_LIMITS = {"/upload": settings.UPLOAD_MAX_BYTES, "/upload/batch": settings.UPLOAD_MAX_BATCH_BYTES}
+app.add_middleware(UploadSizeLimitMiddleware, limits=UPLOAD_LIMITS)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 # === Ensure Upload Dir Exists ===
 UPLOAD_DIR: Path = settings.UPLOAD_DIR
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+@app.on_event("startup")
+async def _startup():
+    # Load the embedding model before the first request needs it
+    await run_in_threadpool(get_embedding_model)
+    if settings.JANITOR_INTERVAL_SECONDS > 0:
+        app.state.janitor = asyncio.create_task(janitor_loop())
+
+@app.on_event("shutdown")
+async def _shutdown():
+    janitor = getattr(app.state, "janitor", None)
+    if janitor is not None:
+        janitor.cancel()
+    await fetcher.aclose()
+    shutdown_parse_pool()
+    if recorder is not None:
+        recorder.close()
+    mark_process_dead()
+
 # === Health Check ===
 @app.get("/", tags=["Health"])
 async def health_check():
@@ -46,45 +126,164 @@ async def health_check():
 @app.post("/upload", response_model=UploadResponse, tags=["Document"])
 async def upload_file(file: UploadFile = File(...)):
     try:
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}_{file.filename}"
-        file_path = UPLOAD_DIR / filename
+        name = os.path.basename(file.filename or "") or "upload.bin"
+        staging_path = UPLOAD_DIR / f"{uuid.uuid4()}_{name}"
+        _, digest = await stream_upload_to_disk(file, staging_path)
 
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
+        # Identical content shares one index (named by its hash), so re-uploads
+        # skip parsing. Callers only ever see a fresh per-upload id mapped to it.
+        file_id = str(uuid.uuid4())
+        index_name = content_index_name(digest)
+        if index_exists(index_name):
+            staging_path.unlink(missing_ok=True)
+            chunk_count = len(get_index(index_name).chunk_store)
+        else:
+            file_path = UPLOAD_DIR / f"{file_id}_{name}"
+            os.replace(staging_path, file_path)
 
-        # Parse and index
-        text_chunks, metadata = parse_document(str(file_path))  # modified parse_document to return both
-        index_document(text_chunks, index_name=file_id, metadata=metadata, save_index=True)
+            # Parse and index
+            text_chunks, metadata = await run_in_threadpool(parse_document, str(file_path))
+            index = await run_in_threadpool(
+                index_document, text_chunks, index_name=index_name, metadata=metadata, save_index=True
+            )
+            cache_index(index_name, index)
+            chunk_count = len(text_chunks)
 
+        write_index_alias(file_id, index_name)
         return UploadResponse(
             message="✅ File uploaded and indexed successfully",
             file_id=file_id,
             file_name=file.filename,
-            chunk_count=len(text_chunks),
+            chunk_count=chunk_count,
         )
 
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.exception("[UPLOAD ERROR] Failed to upload/index document")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Failed to upload and index file")
 
+# === Batch Upload Endpoint ===
+@app.post("/upload/batch", response_model=BatchUploadResponse, tags=["Document"])
+async def upload_batch(files: List[UploadFile] = File(...)):
+    """
+    Accepts many files (and/or .zip archives) in one multipart request, parses
+    them in parallel and writes a single index covering the whole batch.
+    """
+    try:
+        timings = {}
+        batch_id = str(uuid.uuid4())
+        batch_dir = UPLOAD_DIR / batch_id
+        batch_dir.mkdir(parents=True, exist_ok=True)
+
+        # Save uploads, expanding zip archives in place
+        start = time.perf_counter()
+        file_paths: List[Path] = []
+        for upload in files:
+            name = os.path.basename(upload.filename or "") or f"{uuid.uuid4()}.bin"
+            file_path = unique_path(batch_dir, name)
+            await stream_upload_to_disk(upload, file_path)
+            if file_path.suffix.lower() == ".zip":
+                file_paths.extend(await run_in_threadpool(extract_zip, file_path, batch_dir))
+                file_path.unlink()
+            else:
+                file_paths.append(file_path)
+        timings["save"] = time.perf_counter() - start
+        add_server_timing("save", timings["save"])
+
+        # Parse across the process pool
+        start = time.perf_counter()
+        parsed = await run_in_threadpool(parse_documents_parallel, [str(p) for p in file_paths])
+        timings["parse"] = time.perf_counter() - start
+        add_server_timing("parse", timings["parse"])
+
+        # Pack every file's chunks into one embedding pass and one index
+        all_chunks, all_metadata, results = [], [], []
+        for item in parsed:
+            file_name = os.path.basename(item["file_path"])
+            if item["error"] or not item["chunks"]:
+                results.append(BatchFileResult(
+                    file_name=file_name,
+                    status="failed",
+                    parse_time=item["parse_time"],
+                    timings=item["timings"],
+                    error=item["error"] or "No chunks produced",
+                ))
+                continue
+            all_chunks.extend(item["chunks"])
+            all_metadata.extend(item["metadata"])
+            results.append(BatchFileResult(
+                file_name=file_name,
+                status="indexed",
+                chunk_count=len(item["chunks"]),
+                parse_time=item["parse_time"],
+                timings=item["timings"],
+            ))
+
+        if not all_chunks:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail="No extractable text in any uploaded file")
+
+        start = time.perf_counter()
+        index = await run_in_threadpool(
+            index_document, all_chunks, index_name=batch_id, metadata=all_metadata, save_index=True
+        )
+        cache_index(batch_id, index)
+        timings["index"] = time.perf_counter() - start
+
+        indexed = sum(1 for r in results if r.status == "indexed")
+        return BatchUploadResponse(
+            message=f"✅ Indexed {indexed}/{len(results)} files",
+            file_id=batch_id,
+            file_count=len(results),
+            chunk_count=len(all_chunks),
+            files=results,
+            timings=timings,
+        )
+
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.exception("[BATCH UPLOAD ERROR] Failed to ingest batch")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Failed to ingest batch")
+
 # === Ask Endpoint ===
 @app.post("/ask", response_model=AnswerResponse, tags=["Q&A"])
 async def ask_question(
     question: str = Form(...),
     file_id: str = Form(...),
-    provider: str = Form("groq")
+    provider: Optional[str] = Form(None),
+    strategy: str = Form("default")
 ):
+    # Omitted provider -> the strategy's own provider/model
+    if provider is not None and provider.lower() not in ("groq", "openai"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown provider: {provider}")
+    if strategy not in PIPELINES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown strategy: {strategy}")
+
     try:
-        answers, rationales, sources = answer_questions([question], index_name=file_id)
+        index_name = resolve_index_name(file_id)
+        result = await run_in_threadpool(
+            get_pipeline(strategy).run, [question], index_name=index_name, provider=provider
+        )
         return AnswerResponse(
             question=question,
-            answer=answers[0],
-            sources=sources[0],
-            rationale=rationales[0],
-            provider=provider.upper()
+            answer=result.answers[0],
+            sources=to_source_chunks(result.sources[0]),
+            rationale=result.rationales[0],
+            provider=result.provider.upper(),
+            model_name=result.model,
+            confidence_score=result.confidences[0]
         )
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"No index found for file_id: {file_id}")
     except Exception as e:
         logger.exception(f"[ASK ERROR] Failed to answer question: {question}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -113,16 +312,27 @@ async def hackrx_run(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     try:
-        index_name = str(uuid.uuid4())
+        # Conditional GET: an unchanged document is a 304 plus a cached file
+        with stage_timer("download"):
+            document = await fetcher.fetch(payload.documents)
 
-        # Download, parse, and index
-        text_chunks, metadata = download_and_parse_pdf(payload.documents)
-        index_document(text_chunks, index_name=index_name, metadata=metadata, save_index=True)
+        # Content-addressed index name, shared with /upload, so repeat
+        # documents skip parsing/embedding and hit the answer cache
+        index_name = content_index_name(document.sha256)
+        if not index_exists(index_name):
+            text_chunks, metadata = await run_in_threadpool(parse_pdf_file, document.path)
+            index = await run_in_threadpool(
+                index_document, text_chunks, index_name=index_name, metadata=metadata, save_index=True
+            )
+            cache_index(index_name, index)
 
         # Answer questions
-        answers, _, _ = answer_questions(payload.questions, index_name=index_name)
+        answers, _, _ = await run_in_threadpool(answer_questions, payload.questions, index_name=index_name)
+        capture_hackrx(payload.documents, payload.questions, index_name)
         return HackRxResponse(answers=answers)
 
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.exception("[HACKRX ERROR] Error processing document/questions")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
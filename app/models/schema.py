@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 # === Metadata Schema ===
@@ -8,6 +8,7 @@ class ChunkMetadata(BaseModel):
     page: Optional[int] = Field(None, description="Page number in the original document")
     chunk_index: Optional[int] = Field(None, description="Index of the chunk")
     word_count: Optional[int] = Field(None, description="Number of words in the chunk")
+    score: Optional[float] = Field(None, description="Similarity to the question (cosine, higher is closer)")
 
 
 # === Retrieved Document Chunk ===
@@ -37,7 +38,7 @@ class AnswerResponse(BaseModel):
     )
     confidence_score: Optional[float] = Field(
         default=None,
-        description="Optional: confidence score or log probability from LLM, if available"
+        description="Similarity of the best supporting chunk to the question, if available"
     )
     sources: List[SourceChunk] = Field(
         default_factory=list,
@@ -51,3 +52,28 @@ class UploadResponse(BaseModel):
     chunk_count: int
     message: str
     file_id: str
+
+
+# === Batch Upload Responses ===
+class BatchFileResult(BaseModel):
+    file_name: str
+    status: str = Field(..., description="'indexed' or 'failed'")
+    chunk_count: int = 0
+    parse_time: float = Field(0.0, description="Seconds spent parsing this file")
+    timings: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Seconds per extraction stage (e.g. pymupdf, ocr, unstructured, chunk)"
+    )
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    message: str
+    file_id: str = Field(..., description="Index ID covering every successfully parsed file")
+    file_count: int
+    chunk_count: int
+    files: List[BatchFileResult] = Field(default_factory=list)
+    timings: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Wall-clock seconds per ingestion stage (save, parse, index)"
+    )
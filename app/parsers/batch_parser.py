@@ -0,0 +1,165 @@
+import os
+import time
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.app_config import settings
+from app.parsers.file_parser import parse_document_with_timings
+from app.utils.metrics import MULTIPROCESS, QUEUE_DEPTH, observe_stage
+from app.utils.uploads import UploadTooLarge
+
+# === Shared Process Pool ===
+# Spawned (not forked) so workers never inherit the embedding model or the
+# event loop; created lazily and reused so the import cost is paid once.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.INGEST_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def discard_parse_pool(pool: ProcessPoolExecutor):
+    """
+    Drops a broken pool (a worker died) so the next call spawns a fresh one.
+    No-op if another thread already replaced it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_parse_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# === Worker Entry Point ===
+def _parse_one(file_path: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        chunks, metadata, timings = parse_document_with_timings(file_path)
+        error = None
+    except Exception as e:
+        chunks, metadata, timings = [], [], {}
+        error = str(e)
+    return {
+        "file_path": file_path,
+        "chunks": chunks,
+        "metadata": metadata,
+        "parse_time": time.perf_counter() - start,
+        "timings": timings,
+        "error": error,
+    }
+
+
+def parse_documents_parallel(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parses many documents across the shared process pool.
+
+    Each worker dispatches on the file extension exactly like `parse_document`.
+    Failures are captured per file instead of aborting the batch.
+
+    Returns:
+        List[Dict]: One result per input path, in input order, with chunks,
+        metadata, parse_time (seconds), per-stage timings and error (None on success).
+    """
+    if not file_paths:
+        return []
+
+    queue = QUEUE_DEPTH.labels("parse")
+    queue.inc(len(file_paths))
+    results = []
+    try:
+        pool = get_parse_pool()
+        try:
+            parsed = list(pool.map(_parse_one, file_paths))
+        except BrokenProcessPool:
+            # A worker crashed (e.g. OOM on a huge file); retry once on a new pool
+            discard_parse_pool(pool)
+            parsed = list(get_parse_pool().map(_parse_one, file_paths))
+        for result in parsed:
+            results.append(result)
+            queue.dec()
+            # Single-process metrics live in the child; re-observe here. In
+            # multiprocess mode the workers write to the shared metrics dir
+            # already. The request's Server-Timing gets the batch wall time.
+            if not MULTIPROCESS:
+                observe_stage("parse", result["parse_time"], server_timing=False)
+    finally:
+        queue.dec(len(file_paths) - len(results))
+    return results
+
+
+# === Zip Archives ===
+def unique_path(dest_dir: Path, name: str) -> Path:
+    """
+    Returns `dest_dir / name`, suffixed `_1`, `_2`, ... if that path is taken.
+    """
+    target = dest_dir / name
+    stem, suffix = os.path.splitext(name)
+    counter = 1
+    while target.exists():
+        target = dest_dir / f"{stem}_{counter}{suffix}"
+        counter += 1
+    return target
+
+
+def extract_zip(zip_path: Path, dest_dir: Path, max_bytes: int = settings.UPLOAD_MAX_BATCH_BYTES) -> List[Path]:
+    """
+    Extracts regular files from a zip archive into `dest_dir` (flattened).
+    Directory components are dropped to guard against path traversal.
+
+    Raises UploadTooLarge if the declared uncompressed size, or the bytes
+    actually written, exceed `max_bytes` (zip bombs lie about sizes).
+    """
+    extracted = []
+    written = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [
+            m for m in archive.infolist()
+            if not m.is_dir()
+            and os.path.basename(m.filename)
+            and not os.path.basename(m.filename).startswith(".")
+            and "__MACOSX" not in m.filename
+        ]
+        declared = sum(m.file_size for m in members)
+        if declared > max_bytes:
+            raise UploadTooLarge(f"{zip_path.name} expands to {declared} bytes (limit {max_bytes})")
+
+        for member in members:
+            target = unique_path(dest_dir, os.path.basename(member.filename))
+            try:
+                with archive.open(member) as src, open(target, "wb") as dst:
+                    while True:
+                        block = src.read(1024 * 1024)
+                        if not block:
+                            break
+                        written += len(block)
+                        if written > max_bytes:
+                            raise UploadTooLarge(f"{zip_path.name} expands past {max_bytes} bytes")
+                        dst.write(block)
+            except BaseException:
+                target.unlink(missing_ok=True)
+                for path in extracted:
+                    path.unlink(missing_ok=True)
+                raise
+            extracted.append(target)
+    return extracted
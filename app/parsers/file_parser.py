@@ -1,13 +1,38 @@
+import io
 import os
-from typing import List, Tuple
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import fitz  # PyMuPDF
 from PyPDF2 import PdfReader
-from unstructured.partition.auto import partition
 from docx import Document
 from email import policy
 from email.parser import BytesParser
 
+from app.app_config import settings
+from app.utils.metrics import stage_timer
 from app.utils.text_splitter import split_text_into_chunks_with_metadata
 
+# === Optional OCR Dependencies ===
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:  # OCR tier is skipped when unavailable
+    pytesseract = None
+    Image = None
+
+
+# === Stage Timing ===
+@contextmanager
+def timed_stage(timings: Dict[str, float], stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
 
 def parse_pdf(file_path: str) -> str:
     try:
@@ -24,6 +49,79 @@ def parse_pdf(file_path: str) -> str:
         return ""
 
 
+def _extract_pages_pymupdf(file_path: str) -> Optional[List[str]]:
+    try:
+        with fitz.open(file_path) as doc:
+            return [page.get_text() for page in doc]
+    except Exception as e:
+        print(f"[PDF ERROR] PyMuPDF failed on {file_path}: {e}")
+        return None
+
+
+def _ocr_image(png_bytes: bytes) -> str:
+    try:
+        return pytesseract.image_to_string(Image.open(io.BytesIO(png_bytes)))
+    except Exception as e:
+        print(f"[OCR ERROR] {e}")
+        return ""
+
+
+def ocr_pdf_pages(file_path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """
+    OCRs only the given (0-based) pages. Pages are rendered serially, since
+    PyMuPDF is not thread-safe, and recognised in parallel threads (tesseract
+    runs as a subprocess, so threads are enough). Each page is handed to the
+    pool as soon as it is rendered, and rendering waits while 2x
+    OCR_MAX_WORKERS images are pending, so memory stays bounded however many
+    pages are scanned.
+    """
+    if pytesseract is None or not page_numbers:
+        return {}
+
+    pending = threading.BoundedSemaphore(settings.OCR_MAX_WORKERS * 2)
+    futures = {}
+    with ThreadPoolExecutor(max_workers=settings.OCR_MAX_WORKERS) as pool, fitz.open(file_path) as doc:
+        for page_no in page_numbers:
+            pending.acquire()
+            try:
+                png_bytes = doc[page_no].get_pixmap(dpi=settings.OCR_DPI).tobytes("png")
+                future = pool.submit(_ocr_image, png_bytes)
+            except BaseException:
+                pending.release()
+                raise
+            future.add_done_callback(lambda _: pending.release())
+            futures[page_no] = future
+            del png_bytes
+
+        return {page_no: future.result() for page_no, future in futures.items()}
+
+
+def parse_pdf_tiered(file_path: str, timings: Optional[Dict[str, float]] = None) -> str:
+    """
+    Cheap-first PDF extraction: PyMuPDF for every page, OCR only for pages
+    that came back (near) empty, and PyPDF2 if PyMuPDF cannot open the file.
+    """
+    timings = timings if timings is not None else {}
+
+    with timed_stage(timings, "pymupdf"):
+        pages = _extract_pages_pymupdf(file_path)
+
+    if pages is None:
+        with timed_stage(timings, "pypdf2"):
+            return parse_pdf(file_path)
+
+    sparse = [i for i, text in enumerate(pages) if len(text.strip()) < settings.OCR_MIN_PAGE_CHARS]
+    if sparse:
+        print(f"[PDF] {len(sparse)}/{len(pages)} pages have no text layer, running OCR.")
+        with timed_stage(timings, "ocr"):
+            ocr_texts = ocr_pdf_pages(file_path, sparse)
+        for page_no, text in ocr_texts.items():
+            if text.strip():
+                pages[page_no] = text
+
+    return "\n\n".join(pages).strip()
+
+
 def parse_docx(file_path: str) -> str:
     try:
         doc = Document(file_path)
@@ -64,6 +162,8 @@ def parse_eml(file_path: str) -> str:
 
 def parse_with_unstructured(file_path: str) -> str:
     try:
+        # Imported lazily: unstructured is slow to import and is only the last resort
+        from unstructured.partition.auto import partition
         elements = partition(filename=file_path)
         return "\n".join(str(el) for el in elements if str(el).strip())
     except Exception as e:
@@ -71,43 +171,78 @@ def parse_with_unstructured(file_path: str) -> str:
         return ""
 
 
-def parse_document(file_path: str) -> Tuple[List[str], List[dict]]:
+PARSERS: Dict[str, Callable[[str], str]] = {
+    ".pdf": parse_pdf_tiered,
+    ".docx": parse_docx,
+    ".txt": parse_txt,
+    ".eml": parse_eml,
+}
+
+
+def extract_text_with_timings(file_path: str) -> Tuple[str, Dict[str, float]]:
     """
-    Main entry point for parsing any supported document.
+    Extracts raw text from a file, dispatching on its extension. The slow
+    unstructured partitioner only runs for unknown extensions or when the
+    cheaper tiers return nothing.
 
     Returns:
-        Tuple[List[str], List[dict]]: Clean text chunks and metadata (chunk index, range, source).
+        Tuple[str, Dict[str, float]]: Extracted text and seconds spent per stage.
     """
     ext = os.path.splitext(file_path)[-1].lower()
     print(f"[PARSER] File: {file_path} (ext: {ext})")
-
-    text = ""
-
-    if ext == ".pdf":
-        text = parse_pdf(file_path)
-    elif ext == ".docx":
-        text = parse_docx(file_path)
-    elif ext == ".txt":
-        text = parse_txt(file_path)
-    elif ext == ".eml":
-        text = parse_eml(file_path)
+    timings: Dict[str, float] = {}
+
+    parser = PARSERS.get(ext)
+    if parser is parse_pdf_tiered:
+        text = parse_pdf_tiered(file_path, timings)
+    elif parser is not None:
+        with timed_stage(timings, ext.lstrip(".")):
+            text = parser(file_path)
     else:
         print(f"[PARSER] Unknown extension '{ext}', using fallback.")
-        text = parse_with_unstructured(file_path)
+        with timed_stage(timings, "unstructured"):
+            text = parse_with_unstructured(file_path)
 
-    if not text.strip():
+    if not text.strip() and parser is not None:
         print("[PARSER] Primary extraction failed. Trying fallback...")
-        text = parse_with_unstructured(file_path)
+        with timed_stage(timings, "unstructured"):
+            text = parse_with_unstructured(file_path)
 
     if not text.strip():
         raise ValueError(f"[PARSER ERROR] No extractable text from: {file_path}")
 
-    print(f"[PARSER] Text extraction succeeded: {len(text)} characters.")
+    stages = ", ".join(f"{k}={v:.3f}s" for k, v in timings.items())
+    print(f"[PARSER] Text extraction succeeded: {len(text)} characters ({stages}).")
+    return text, timings
+
+
+def extract_text(file_path: str) -> str:
+    return extract_text_with_timings(file_path)[0]
+
+
+def parse_document_with_timings(file_path: str) -> Tuple[List[str], List[dict], Dict[str, float]]:
+    """
+    Same as `parse_document`, additionally returning per-stage timings in seconds.
+    """
+    with stage_timer("parse"):
+        text, timings = extract_text_with_timings(file_path)
 
     # Use advanced splitter with metadata
     file_name = os.path.basename(file_path)
-    chunks, metadata = split_text_into_chunks_with_metadata(
-        text, chunk_size=500, overlap=50, source_name=file_name
-    )
+    with timed_stage(timings, "chunk"), stage_timer("chunk"):
+        chunks, metadata = split_text_into_chunks_with_metadata(
+            text, chunk_size=500, overlap=50, source_name=file_name
+        )
+
+    return chunks, metadata, timings
 
+
+def parse_document(file_path: str) -> Tuple[List[str], List[dict]]:
+    """
+    Main entry point for parsing any supported document.
+
+    Returns:
+        Tuple[List[str], List[dict]]: Clean text chunks and metadata (chunk index, range, source).
+    """
+    chunks, metadata, _ = parse_document_with_timings(file_path)
     return chunks, metadata
@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.models.schema import ChunkMetadata, SourceChunk
+
+# Stored in int columns where a field (page, source) is unknown
+MISSING = -1
+
+COLUMNS = ("chunk_index", "page", "word_count", "source_id")
+
+
+# === Retrieved Chunk ===
+class RetrievedChunk(NamedTuple):
+    """
+    A search hit. Plain tuple on the retrieval/generation path; converted to
+    a pydantic SourceChunk only when it leaves through the API. `id` is the
+    FAISS row; `chunk_index` is the chunk's position within its source file.
+    """
+    id: int
+    chunk_index: int
+    content: str
+    source: Optional[str]
+    page: Optional[int]
+    word_count: int
+    score: Optional[float]
+
+    def to_source_chunk(self) -> SourceChunk:
+        return SourceChunk(
+            content=self.content,
+            metadata=ChunkMetadata(
+                chunk_index=self.chunk_index,
+                source=self.source,
+                page=self.page,
+                word_count=self.word_count,
+                score=self.score,
+            ),
+        )
+
+
+def to_source_chunks(chunks: Sequence[RetrievedChunk]) -> List[SourceChunk]:
+    return [chunk.to_source_chunk() for chunk in chunks]
+
+
+# === Column Store ===
+class ChunkStore:
+    """
+    Column-oriented chunk texts and metadata for one index.
+
+    Texts share a single UTF-8 buffer addressed by offsets. Metadata is a set of
+    int32 numpy columns (row = FAISS id) plus a table of distinct source names.
+    This replaces one str and one dict per chunk.
+    """
+
+    def __init__(
+        self,
+        text_blob: bytes,
+        text_offsets: np.ndarray,
+        sources: List[str],
+        **columns: np.ndarray,
+    ):
+        self.text_blob = text_blob
+        self.text_offsets = text_offsets
+        self.sources = sources
+        self.chunk_index = columns["chunk_index"]
+        self.page = columns["page"]
+        self.word_count = columns["word_count"]
+        self.source_id = columns["source_id"]
+
+    @classmethod
+    def from_chunks(cls, texts: List[str], metadata: Optional[List[Dict]] = None) -> "ChunkStore":
+        """
+        Builds the store from splitter output: chunk texts plus one metadata
+        dict per chunk (source, chunk_index, word_count, page).
+        """
+        n = len(texts)
+        metadata = metadata or []
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        columns = {name: np.full(n, MISSING, dtype=np.int32) for name in COLUMNS}
+        source_ids: Dict[str, int] = {}
+
+        for i, text in enumerate(texts):
+            # Legacy pickles may carry fewer metadata dicts than texts
+            meta = (metadata[i] if i < len(metadata) else None) or {}
+            columns["chunk_index"][i] = meta.get("chunk_index", i)
+            if meta.get("page") is not None:
+                columns["page"][i] = meta["page"]
+            word_count = meta.get("word_count")
+            columns["word_count"][i] = word_count if word_count is not None else len(text.split())
+            source = meta.get("source")
+            if source is not None:
+                columns["source_id"][i] = source_ids.setdefault(source, len(source_ids))
+
+        return cls(b"".join(encoded), offsets, list(source_ids), **columns)
+
+    # === Persistence ===
+    def to_state(self) -> Dict[str, Any]:
+        state = {name: getattr(self, name) for name in COLUMNS}
+        state.update(text_blob=self.text_blob, text_offsets=self.text_offsets, sources=self.sources)
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "ChunkStore":
+        """
+        Restores a store from `to_state()` output, or converts a legacy
+        {"texts", "meta"} index pickle.
+        """
+        if "texts" in state:
+            return cls.from_chunks(state["texts"], state.get("meta"))
+        # Columns no longer kept (e.g. word spans) are ignored
+        return cls(**state)
+
+    # === Row Access ===
+    def __len__(self) -> int:
+        return len(self.text_offsets) - 1
+
+    def text(self, i: int) -> str:
+        return self.text_blob[self.text_offsets[i]:self.text_offsets[i + 1]].decode("utf-8")
+
+    def source(self, i: int) -> Optional[str]:
+        source_id = self.source_id[i]
+        return self.sources[source_id] if source_id != MISSING else None
+
+    def page_of(self, i: int) -> Optional[int]:
+        page = self.page[i]
+        return int(page) if page != MISSING else None
+
+    def hits(self, ids, scores=None) -> List[RetrievedChunk]:
+        """
+        Returns a RetrievedChunk per valid id (FAISS pads short results with -1),
+        in the given order.
+        """
+        n = len(self)
+        results = []
+        for rank, i in enumerate(ids):
+            i = int(i)
+            if 0 <= i < n:
+                results.append(RetrievedChunk(
+                    i,
+                    int(self.chunk_index[i]),
+                    self.text(i),
+                    self.source(i),
+                    self.page_of(i),
+                    int(self.word_count[i]),
+                    float(scores[rank]) if scores is not None else None,
+                ))
+        return results
@@ -1,83 +1,260 @@
 import os
 import faiss
+import logging
 import pickle
+import threading
 import numpy as np
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
-from app.models.schema import SourceChunk, ChunkMetadata
+from typing import List, Dict, NamedTuple, Optional, Tuple
+from app.app_config import settings
+from app.utils.metrics import stage_timer
+from app.utils.disk_cache import DiskCache
+from app.utils.file_lock import atomic_write_bytes, file_lock
+from app.retrieval.chunk_store import ChunkStore, RetrievedChunk
+from app.retrieval.selection import l2_to_similarity  # re-exported for existing callers
+
+logger = logging.getLogger(__name__)
 
 # === FAISS Index Directory ===
-INDEX_ROOT = "vector_indexes"
-os.makedirs(INDEX_ROOT, exist_ok=True)
+INDEX_ROOT = str(settings.INDEX_ROOT)
+LOCK_ROOT = os.path.join(INDEX_ROOT, ".locks")
+ALIAS_ROOT = os.path.join(INDEX_ROOT, ".aliases")
+os.makedirs(LOCK_ROOT, exist_ok=True)
+os.makedirs(ALIAS_ROOT, exist_ok=True)
+
+# Prefix of indexes named by document content; such names are never handed out
+CONTENT_INDEX_PREFIX = "sha256_"
 
 # === Embedding Model ===
-embedding_model = SentenceTransformer("BAAI/bge-base-en-v1.5")  # ✅ Solid for production
+EMBEDDING_MODEL_NAME = "BAAI/bge-base-en-v1.5"
+_embedding_model = None
+_model_lock = threading.Lock()
+
+def get_embedding_model():
+    """
+    Loads the sentence-transformers model on first use (the server preloads
+    it at startup), so index handling can be imported without it.
+    """
+    global _embedding_model
+    with _model_lock:
+        if _embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)  # ✅ Solid for production
+    return _embedding_model
+
+# Query embeddings shared by all workers through the on-disk cache
+query_embedding_cache = DiskCache(settings.CACHE_DIR, "embedding") if settings.EMBEDDING_CACHE else None
 
 # === Embedding Helper ===
-def embed_chunks(chunks: List[str]) -> np.ndarray:
-    return embedding_model.encode(chunks, show_progress_bar=False).astype(np.float32)
+def embed_chunks(chunks: List[str], batch_size: int = settings.EMBED_BATCH_SIZE) -> np.ndarray:
+    with stage_timer("embed"):
+        return get_embedding_model().encode(
+            chunks, batch_size=batch_size, show_progress_bar=False
+        ).astype(np.float32)
+
+def embed_query(query: str) -> np.ndarray:
+    """
+    Embeds a single query as a (1, dim) matrix, reusing cached vectors.
+    """
+    if query_embedding_cache is None:
+        return embed_chunks([query])
+    key = f"{EMBEDDING_MODEL_NAME}\n{query}"
+    vector = query_embedding_cache.get(key)
+    if vector is None:
+        vector = embed_chunks([query])
+        query_embedding_cache.set(key, vector)
+    return vector
 
 # === Core Indexing Logic ===
-def create_faiss_index(chunks: List[str], metadata: List[Dict]) -> faiss.Index:
-    embeddings = embed_chunks(chunks)
-    dim = embeddings.shape[1]
+class DocumentIndex(NamedTuple):
+    """
+    A FAISS index and the chunk texts/metadata for its rows. SWIG index
+    objects don't take new attributes, so the two travel together here.
+    """
+    faiss_index: faiss.Index
+    chunk_store: ChunkStore
 
-    index = faiss.IndexFlatL2(dim)
+def build_faiss_index(embeddings: np.ndarray, index_type: str = settings.INDEX_TYPE) -> faiss.Index:
+    """
+    Builds an exact ("flat") or approximate ("hnsw") L2 index over the embeddings.
+    """
+    dim = embeddings.shape[1]
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, settings.HNSW_M)
+        index.hnsw.efSearch = settings.HNSW_EF_SEARCH
+    else:
+        raise ValueError(f"Unsupported index type: {index_type}")
     index.add(embeddings)
-
-    # Attach chunk content and metadata to index
-    index.chunk_texts = chunks
-    index.chunk_metadata = metadata
     return index
 
+def create_faiss_index(chunks: List[str], metadata: List[Dict], index_type: str = settings.INDEX_TYPE) -> DocumentIndex:
+    embeddings = embed_chunks(chunks)
+    return DocumentIndex(build_faiss_index(embeddings, index_type), ChunkStore.from_chunks(chunks, metadata))
+
 # === Save Index to Disk ===
-def save_faiss_index(index: faiss.Index, index_name: str):
-    faiss.write_index(index, os.path.join(INDEX_ROOT, f"{index_name}.index"))
-    with open(os.path.join(INDEX_ROOT, f"{index_name}_meta.pkl"), "wb") as f:
-        pickle.dump({
-            "texts": index.chunk_texts,
-            "meta": index.chunk_metadata
-        }, f)
+def _index_paths(index_name: str) -> Tuple[str, str, str]:
+    return (
+        os.path.join(INDEX_ROOT, f"{index_name}.index"),
+        os.path.join(INDEX_ROOT, f"{index_name}_meta.pkl"),
+        os.path.join(LOCK_ROOT, f"{index_name}.lock"),
+    )
+
+def save_faiss_index(index: DocumentIndex, index_name: str):
+    """
+    Publishes the index atomically: both files are written to temp names and
+    renamed into place (metadata first, index last) under an exclusive lock,
+    so concurrent readers never see a half-written `.index`/`_meta.pkl` pair.
+    """
+    index_path, meta_path, lock_path = _index_paths(index_name)
+    meta_bytes = pickle.dumps(index.chunk_store.to_state(), protocol=pickle.HIGHEST_PROTOCOL)
+
+    with stage_timer("index_write"), file_lock(lock_path):
+        tmp_index_path = f"{index_path}.{os.getpid()}.tmp"
+        faiss.write_index(index.faiss_index, tmp_index_path)
+        atomic_write_bytes(meta_path, meta_bytes)
+        os.replace(tmp_index_path, index_path)
 
 # === Load Index from Disk ===
-def load_faiss_index(index_name: str) -> faiss.Index:
-    index_path = os.path.join(INDEX_ROOT, f"{index_name}.index")
-    meta_path = os.path.join(INDEX_ROOT, f"{index_name}_meta.pkl")
+_mmap_warned = False
 
-    if not os.path.exists(index_path) or not os.path.exists(meta_path):
-        raise FileNotFoundError(f"FAISS index or metadata not found for: {index_name}")
+def _warn_no_shared_mmap(reason: str):
+    global _mmap_warned
+    if not _mmap_warned:
+        _mmap_warned = True
+        logger.warning(
+            f"[INDEX] Memory-mapped loading unavailable ({reason}); each worker keeps "
+            f"its own copy of every index. Upgrade faiss-cpu or set INDEX_MMAP=False."
+        )
 
-    index = faiss.read_index(index_path)
-    with open(meta_path, "rb") as f:
-        meta = pickle.load(f)
+def _read_index(index_path: str) -> faiss.Index:
+    if settings.INDEX_MMAP:
+        # Memory-mapped, read-only: workers share the OS page cache instead of
+        # each holding a private copy of the vectors
+        if not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+            _warn_no_shared_mmap("this faiss build has no IO_FLAG_MMAP_IFC")
+            return faiss.read_index(index_path)
+        try:
+            return faiss.read_index(index_path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            _warn_no_shared_mmap(str(e))
+    return faiss.read_index(index_path)
 
-    index.chunk_texts = meta["texts"]
-    index.chunk_metadata = meta["meta"]
-    return index
+def load_faiss_index(index_name: str) -> DocumentIndex:
+    index_path, meta_path, lock_path = _index_paths(index_name)
+
+    with stage_timer("index_load"), file_lock(lock_path, shared=True):
+        if not os.path.exists(index_path) or not os.path.exists(meta_path):
+            raise FileNotFoundError(f"FAISS index or metadata not found for: {index_name}")
+
+        faiss_index = _read_index(index_path)
+        with open(meta_path, "rb") as f:
+            meta = pickle.load(f)
+
+    # Also accepts indexes saved before the chunk store ({"texts", "meta"})
+    return DocumentIndex(faiss_index, ChunkStore.from_state(meta))
+
+# === Index Lifecycle ===
+def index_exists(index_name: str) -> bool:
+    index_path, meta_path, _ = _index_paths(index_name)
+    return os.path.exists(index_path) and os.path.exists(meta_path)
+
+def content_index_name(digest: str) -> str:
+    """
+    Internal index name for a document identified by its SHA-256, so identical
+    uploads and HackRx documents share one index.
+    """
+    return f"{CONTENT_INDEX_PREFIX}{digest[:32]}"
+
+def write_index_alias(alias: str, index_name: str):
+    """
+    Maps a caller-facing id (e.g. an upload's uuid4 file_id) to an index.
+    """
+    atomic_write_bytes(os.path.join(ALIAS_ROOT, alias), index_name.encode("utf-8"))
+
+def resolve_index_name(file_id: str) -> str:
+    """
+    Returns the index behind a caller-supplied id. Aliases resolve to their
+    index; batch ids and older uploads are index names themselves. Content
+    hashes are not accepted, so callers can't probe for a document by hash.
+    """
+    if not file_id or os.path.basename(file_id) != file_id or file_id.startswith("."):
+        raise FileNotFoundError(f"Invalid file_id: {file_id}")
+    try:
+        with open(os.path.join(ALIAS_ROOT, file_id), "rb") as f:
+            return f.read().decode("utf-8")
+    except FileNotFoundError:
+        pass
+    if file_id.startswith(CONTENT_INDEX_PREFIX):
+        raise FileNotFoundError(f"No index found for file_id: {file_id}")
+    return file_id
+
+def prune_index_aliases() -> int:
+    """
+    Removes aliases whose index has been deleted. Returns how many went.
+    """
+    removed = 0
+    for alias in os.listdir(ALIAS_ROOT):
+        path = os.path.join(ALIAS_ROOT, alias)
+        try:
+            with open(path, "rb") as f:
+                target = f.read().decode("utf-8")
+            if not index_exists(target):
+                os.remove(path)
+                removed += 1
+        except (OSError, UnicodeDecodeError):
+            continue
+    return removed
+
+def touch_index(index_name: str):
+    """
+    Marks an index as recently used; the janitor evicts by this mtime.
+    """
+    index_path, _, _ = _index_paths(index_name)
+    try:
+        os.utime(index_path, None)
+    except OSError:
+        pass
+
+def delete_faiss_index(index_name: str) -> int:
+    """
+    Removes both index files under the writer lock. Returns bytes freed.
+    """
+    index_path, meta_path, lock_path = _index_paths(index_name)
+    freed = 0
+    with file_lock(lock_path):
+        for path in (index_path, meta_path):
+            try:
+                freed += os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    try:
+        os.remove(lock_path)
+    except OSError:
+        pass
+    return freed
 
 # === Retrieve Top-k Chunks ===
-def get_top_k_chunks(query: str, index: faiss.Index, top_k: int = 5) -> List[SourceChunk]:
-    query_vec = embed_chunks([query])
-    distances, indices = index.search(query_vec, top_k)
-
-    results = []
-    for i in indices[0]:
-        if 0 <= i < len(index.chunk_texts):
-            chunk_meta = ChunkMetadata(
-                chunk_index=i,
-                source=getattr(index, "source_name", None),
-                page=getattr(index, "chunk_pages", {}).get(i),
-                word_count=len(index.chunk_texts[i].split())
-            )
-            results.append(SourceChunk(
-                content=index.chunk_texts[i],
-                metadata=chunk_meta.dict()  # ✅ Dict for pydantic validation
-            ))
-
-    return results
+def search_index(query: str, index: DocumentIndex, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (chunk ids, similarity scores) for the query, best first.
+    """
+    # Query embedding is timed as "embed"; "retrieval" is the search alone
+    query_vec = embed_query(query)
+    with stage_timer("retrieval"):
+        distances, indices = index.faiss_index.search(query_vec, k)
+    return indices[0], l2_to_similarity(distances[0])
+
+def chunks_from_ids(index: DocumentIndex, ids, scores=None) -> List[RetrievedChunk]:
+    return index.chunk_store.hits(ids, scores)
+
+def get_top_k_chunks(query: str, index: DocumentIndex, top_k: int = 5) -> List[RetrievedChunk]:
+    ids, scores = search_index(query, index, top_k)
+    return chunks_from_ids(index, ids, scores)
 
 # === Index Entry Point ===
-def index_document(chunks: List[str], index_name: str, metadata: List[Dict], save_index: bool = True):
+def index_document(chunks: List[str], index_name: str, metadata: List[Dict], save_index: bool = True) -> DocumentIndex:
     index = create_faiss_index(chunks, metadata)
     if save_index:
         save_faiss_index(index, index_name)
@@ -0,0 +1,413 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from cachetools import LRUCache
+
+from app.app_config import settings
+from app.llm_wrappers.openai_groq import get_llm_response
+from app.llm_wrappers.prompts import (
+    ChatPrompt,
+    expert_chat_prompt,
+    map_prompt,
+    multi_query_prompt,
+    reduce_prompt,
+    refine_chat_prompt,
+    refine_step_prompt,
+    standard_prompt,
+)
+from app.retrieval.chunk_store import RetrievedChunk
+from app.retrieval.embedding_engine import (
+    DocumentIndex,
+    chunks_from_ids,
+    get_top_k_chunks,
+    load_faiss_index,
+    search_index,
+    touch_index,
+)
+from app.retrieval.query_expansion import expanded_query_vectors, fused_search
+from app.retrieval.selection import select_adaptive
+from app.utils.disk_cache import DiskCache
+from app.utils.metrics import PIPELINE_STAGE_LATENCY, record_cache
+
+# === Loaded Index Cache ===
+# Indexes are immutable once written, so a loaded index can be shared by every
+# request and strategy instead of being re-read from disk per call.
+_index_cache: LRUCache = LRUCache(maxsize=settings.INDEX_CACHE_SIZE)
+_index_lock = threading.Lock()
+
+
+def get_index(index_name: str) -> DocumentIndex:
+    with _index_lock:
+        index = _index_cache.get(index_name)
+    record_cache("index", index is not None)
+    if index is None:
+        index = load_faiss_index(index_name)
+        cache_index(index_name, index)
+    touch_index(index_name)
+    return index
+
+
+def cache_index(index_name: str, index: DocumentIndex):
+    with _index_lock:
+        _index_cache[index_name] = index
+
+
+def evict_index(index_name: str):
+    with _index_lock:
+        _index_cache.pop(index_name, None)
+
+
+# === Answer Cache ===
+# Shared on disk by every worker; index names are never reused for different
+# content, so (strategy, model, index, question) fully determines an answer.
+# Entries hold RetrievedChunk tuples; the "answer_v2" namespace keeps older
+# entries (pickled SourceChunk models) from being read back.
+answer_cache = DiskCache(settings.CACHE_DIR, "answer_v2") if settings.ANSWER_CACHE else None
+
+
+def default_model(provider: str) -> str:
+    return settings.OPENAI_MODEL_NAME if provider == "openai" else settings.GROQ_MODEL_NAME
+
+
+# === Retriever Stages ===
+class TopKRetriever:
+    """Plain top-k similarity search."""
+
+    def __init__(self, top_k: int = 5):
+        self.top_k = top_k
+
+    def retrieve(self, question: str, index: DocumentIndex, llm: "LLMClient") -> List[RetrievedChunk]:
+        return get_top_k_chunks(question, index, top_k=self.top_k)
+
+
+class AdaptiveRetriever:
+    """
+    Over-fetches once and keeps as many hits as the score distribution and
+    the context token budget justify (see selection.select_adaptive).
+    """
+
+    def __init__(self, fetch_k: int = settings.ADAPTIVE_FETCH_K, **limits):
+        self.fetch_k = fetch_k
+        self.limits = limits
+
+    def retrieve(self, question: str, index: DocumentIndex, llm: "LLMClient") -> List[RetrievedChunk]:
+        ids, scores = search_index(question, index, self.fetch_k)
+        word_counts = index.chunk_store.word_count
+        selected = select_adaptive(ids, scores, lambda i: int(word_counts[i]), **self.limits)
+        return chunks_from_ids(index, [i for i, _ in selected], [s for _, s in selected])
+
+
+def default_retriever(top_k: int):
+    """Retriever for single-query strategies, per RETRIEVAL_MODE."""
+    if settings.RETRIEVAL_MODE == "adaptive":
+        return AdaptiveRetriever(max_k=max(top_k, settings.ADAPTIVE_MAX_K))
+    return TopKRetriever(top_k)
+
+
+class LLMMultiQueryRetriever:
+    """
+    Asks the LLM for alternative phrasings and merges the hits of every variant
+    (same behaviour as LangChain's MultiQueryRetriever; costs one LLM call).
+    """
+
+    def __init__(self, top_k: int = 6, variants: int = 3):
+        self.top_k = top_k
+        self.variants = variants
+
+    def retrieve(self, question: str, index: DocumentIndex, llm: "LLMClient") -> List[RetrievedChunk]:
+        response = llm.complete(multi_query_prompt(question, self.variants))
+        queries = [question] + [line.strip() for line in response.splitlines() if line.strip()]
+
+        seen, merged = set(), []
+        for query in queries[: self.variants + 1]:
+            for chunk in get_top_k_chunks(query, index, top_k=self.top_k):
+                if chunk.id not in seen:
+                    seen.add(chunk.id)
+                    merged.append(chunk)
+        return merged
+
+
+class LocalMultiQueryRetriever:
+    """
+    Multi-query retrieval without the rephrasing LLM call: variants are built
+    locally (and cached per normalised question), searched in one batched
+    FAISS call and merged with reciprocal rank fusion.
+    """
+
+    def __init__(self, top_k: int = 6):
+        self.top_k = top_k
+
+    def retrieve(self, question: str, index: DocumentIndex, llm: "LLMClient") -> List[RetrievedChunk]:
+        _, vectors = expanded_query_vectors(question)
+        ids, scores = fused_search(index.faiss_index, vectors, self.top_k)
+        return chunks_from_ids(index, ids, scores)
+
+
+# === Context Builder Stages ===
+class JoinedContextBuilder:
+    """Concatenates chunk texts in retrieval order."""
+
+    def __init__(self, separator: str = " "):
+        self.separator = separator
+
+    def build(self, chunks: List[RetrievedChunk]) -> str:
+        return self.separator.join(chunk.content for chunk in chunks)
+
+
+class SortedContextBuilder(JoinedContextBuilder):
+    """
+    Concatenates chunk texts in chunk-ID order, so the same set of chunks
+    always yields byte-identical context (and a reusable cached prefix)
+    whatever order retrieval ranked them in.
+    """
+
+    def build(self, chunks: List[RetrievedChunk]) -> str:
+        return super().build(sorted(chunks, key=lambda chunk: chunk.id))
+
+
+# === Generator Stages ===
+class LLMClient:
+    """
+    Thin per-call binding of provider/model/sampling settings over the shared
+    SDK clients in openai_groq; counts calls for cost comparisons.
+    """
+
+    def __init__(self, provider: str, model: str, temperature: float, max_tokens: int):
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def complete(self, prompt: str, system: Optional[str] = None) -> str:
+        with self._calls_lock:
+            self.calls += 1
+        return get_llm_response(
+            prompt=prompt,
+            provider=self.provider,
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            system=system,
+        )
+
+
+class PromptGenerator:
+    """Single LLM call over the whole built context."""
+
+    def __init__(self, prompt_fn: Callable[[str, str], str]):
+        self.prompt_fn = prompt_fn
+
+    def generate(self, question: str, context: str, chunks: List[RetrievedChunk], llm: LLMClient) -> str:
+        return llm.complete(self.prompt_fn(question, context))
+
+
+class ChatPromptGenerator:
+    """
+    Single LLM call with instructions and context in a stable system message
+    and the question alone in the user message. Questions over the same
+    context share the whole system prefix, which OpenAI-compatible providers
+    can serve from their prompt cache.
+    """
+
+    def __init__(self, prompt_fn: Callable[[str, str], ChatPrompt]):
+        self.prompt_fn = prompt_fn
+
+    def generate(self, question: str, context: str, chunks: List[RetrievedChunk], llm: LLMClient) -> str:
+        prompt = self.prompt_fn(question, context)
+        return llm.complete(prompt.user, system=prompt.system)
+
+
+class RefineGenerator:
+    """
+    Answers from the first chunk, then refines the answer with each further
+    chunk in turn (one sequential LLM call per chunk).
+    """
+
+    def generate(self, question: str, context: str, chunks: List[RetrievedChunk], llm: LLMClient) -> str:
+        if not chunks:
+            return "No relevant context found."
+        answer = llm.complete(standard_prompt(question, chunks[0].content))
+        for chunk in chunks[1:]:
+            answer = llm.complete(refine_step_prompt(question, answer, chunk.content))
+        return answer
+
+
+class MapReduceGenerator:
+    """
+    Map-reduce alternative to RefineGenerator: one extraction call per chunk,
+    all in flight concurrently, then a single reduce call. Wall time is about
+    two LLM round trips instead of one per chunk.
+    """
+
+    def __init__(self, max_workers: int = settings.MAP_REDUCE_WORKERS):
+        self.max_workers = max_workers
+
+    def generate(self, question: str, context: str, chunks: List[RetrievedChunk], llm: LLMClient) -> str:
+        if not chunks:
+            return "No relevant context found."
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+            # Each task runs in a copy of the request context so stage timers
+            # still land in the request's Server-Timing header
+            futures = [
+                pool.submit(contextvars.copy_context().run, llm.complete, map_prompt(question, chunk.content))
+                for chunk in chunks
+            ]
+            notes = [f.result().strip() for f in futures]
+
+        relevant = [n for n in notes if n and n.upper().rstrip(".") != "NONE"]
+        if not relevant:
+            return "I don't know."
+        return llm.complete(reduce_prompt(question, "\n\n".join(f"- {n}" for n in relevant)))
+
+
+# === Pipeline ===
+@dataclass
+class PipelineResult:
+    answers: List[str] = field(default_factory=list)
+    rationales: List[str] = field(default_factory=list)
+    sources: List[List[RetrievedChunk]] = field(default_factory=list)
+    timings: List[Dict[str, float]] = field(default_factory=list)
+    confidences: List[Optional[float]] = field(default_factory=list)
+    provider: str = ""
+    model: str = ""
+    llm_calls: int = 0
+
+
+StageHook = Callable[[str, str, float], None]
+
+
+class QAPipeline:
+    """
+    Retriever -> context builder -> generator, over cached indexes and shared
+    LLM clients. Hooks receive (pipeline name, stage, seconds) for every stage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retriever,
+        context_builder,
+        generator,
+        provider: str = "groq",
+        model: Optional[str] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+    ):
+        self.name = name
+        self.retriever = retriever
+        self.context_builder = context_builder
+        self.generator = generator
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.hooks: List[StageHook] = []
+
+    def add_hook(self, hook: StageHook):
+        self.hooks.append(hook)
+
+    def llm_for(self, provider: Optional[str] = None) -> LLMClient:
+        provider = (provider or self.provider).lower()
+        # A pinned model only applies to the pipeline's own provider
+        model = self.model if provider == self.provider and self.model else default_model(provider)
+        return LLMClient(provider, model, self.temperature, self.max_tokens)
+
+    @contextmanager
+    def _stage(self, stage: str, timings: Dict[str, float]):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[stage] = elapsed
+            PIPELINE_STAGE_LATENCY.labels(self.name, stage).observe(elapsed)
+            for hook in self.hooks:
+                hook(self.name, stage, elapsed)
+
+    def run(self, questions: List[str], index_name: str, provider: Optional[str] = None) -> PipelineResult:
+        llm = self.llm_for(provider)
+        result = PipelineResult(provider=llm.provider, model=llm.model)
+
+        timings: Dict[str, float] = {}
+        with self._stage("index_load", timings):
+            index = get_index(index_name)
+
+        for question in questions:
+            timings = {}
+            cache_key = f"{self.name}|{llm.provider}|{llm.model}|{settings.RETRIEVAL_MODE}|{index_name}|{question}"
+            cached = answer_cache.get(cache_key) if answer_cache is not None else None
+
+            if cached is not None:
+                answer, context, chunks = cached
+            else:
+                with self._stage("retrieve", timings):
+                    chunks = self.retriever.retrieve(question, index, llm)
+                with self._stage("context", timings):
+                    context = self.context_builder.build(chunks)
+                with self._stage("generate", timings):
+                    try:
+                        answer = self.generator.generate(question, context, chunks, llm)
+                    except Exception as e:
+                        answer = f"[Error generating answer: {str(e)}]"
+
+                if answer_cache is not None and not answer.startswith(("[Error", "[LLM Error")):
+                    answer_cache.set(cache_key, (answer, context, chunks))
+
+            result.answers.append(answer)
+            result.rationales.append(context)
+            result.sources.append(chunks)
+            scores = [c.score for c in chunks if c.score is not None]
+            result.confidences.append(max(scores) if scores else None)
+            result.timings.append(timings)
+
+        result.llm_calls = llm.calls
+        return result
+
+
+# === Strategy Registry ===
+PIPELINES: Dict[str, QAPipeline] = {
+    # search_engine: insurance-analyst prompt on Groq LLaMA3
+    "default": QAPipeline(
+        "default", default_retriever(5), SortedContextBuilder(), ChatPromptGenerator(refine_chat_prompt),
+        provider="groq", model="llama3-70b-8192", temperature=0.1, max_tokens=1024,
+    ),
+    # search_engine1: insurance-expert prompt on GPT-3.5
+    "gpt35": QAPipeline(
+        "gpt35", default_retriever(5), SortedContextBuilder(), ChatPromptGenerator(expert_chat_prompt),
+        provider="openai", model="gpt-3.5-turbo", temperature=0.2, max_tokens=300,
+    ),
+    # qa_engine.get_answer_rag: locally expanded multi-query retrieval + "stuff" prompt
+    "rag": QAPipeline(
+        "rag", LocalMultiQueryRetriever(top_k=6), JoinedContextBuilder("\n\n"), PromptGenerator(standard_prompt),
+        provider=settings.provider, temperature=settings.TEMPERATURE, max_tokens=settings.MAX_TOKENS,
+    ),
+    # Previous rag behaviour: LLM rephrasing costs one extra call per question
+    "rag_llm": QAPipeline(
+        "rag_llm", LLMMultiQueryRetriever(top_k=6), JoinedContextBuilder("\n\n"), PromptGenerator(standard_prompt),
+        provider=settings.provider, temperature=settings.TEMPERATURE, max_tokens=settings.MAX_TOKENS,
+    ),
+    # qa_engine.get_answer_refine_rag: sequential refine over 10 chunks
+    "refine": QAPipeline(
+        "refine", TopKRetriever(10), JoinedContextBuilder("\n\n"), RefineGenerator(),
+        provider=settings.provider, temperature=settings.TEMPERATURE, max_tokens=settings.MAX_TOKENS,
+    ),
+    # Concurrent map over the same 10 chunks, then one reduce call
+    "map_reduce": QAPipeline(
+        "map_reduce", TopKRetriever(10), JoinedContextBuilder("\n\n"), MapReduceGenerator(),
+        provider=settings.provider, temperature=settings.TEMPERATURE, max_tokens=settings.MAX_TOKENS,
+    ),
+}
+
+
+def get_pipeline(name: str = "default") -> QAPipeline:
+    if name not in PIPELINES:
+        raise ValueError(f"Unknown QA strategy: {name}")
+    return PIPELINES[name]
@@ -0,0 +1,109 @@
+import re
+import threading
+from typing import Dict, List, Tuple
+
+import faiss
+import numpy as np
+from cachetools import LRUCache
+
+from app.app_config import settings
+from app.retrieval.selection import l2_to_similarity
+from app.utils.metrics import record_cache, stage_timer
+
+# === Local Query Variants ===
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "does", "do", "did",
+    "what", "which", "who", "whom", "how", "when", "where", "why", "there", "this",
+    "that", "these", "those", "of", "for", "in", "on", "to", "under", "by", "with",
+    "and", "or", "any", "it", "its", "my", "i", "me", "we", "our", "you", "your",
+    "can", "could", "will", "would", "should", "policy", "please", "tell", "about",
+}
+QUESTION_PREFIX = re.compile(
+    r"^(what|which|how|when|where|why|who|does|do|is|are|can|will)\b(\s+(is|are|does|do|the|this|there|a|an))*\s+",
+    re.IGNORECASE,
+)
+
+
+def normalise_question(question: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+def expand_question(question: str) -> List[str]:
+    """
+    Builds retrieval variants without an LLM call: the original question, its
+    content keywords, and the question with its interrogative lead stripped.
+    """
+    variants = [question.strip()]
+
+    normalised = normalise_question(question)
+    keywords = " ".join(w for w in normalised.split() if w not in STOPWORDS)
+    statement = QUESTION_PREFIX.sub("", question.strip()).rstrip("?").strip()
+
+    for variant in (keywords, statement):
+        if variant and variant.lower() not in (v.lower() for v in variants):
+            variants.append(variant)
+    return variants
+
+
+# === Expansion Cache ===
+# Keyed by normalised question so repeated phrasings (and the same question
+# against many documents) skip both expansion and variant embedding.
+_expansion_cache: LRUCache = LRUCache(maxsize=settings.QUERY_EXPANSION_CACHE_SIZE)
+_cache_lock = threading.Lock()
+
+
+def expanded_query_vectors(question: str) -> Tuple[List[str], np.ndarray]:
+    key = normalise_question(question)
+    with _cache_lock:
+        cached = _expansion_cache.get(key)
+    record_cache("query_expansion", cached is not None)
+    if cached is not None:
+        return cached
+
+    # Imported here so expansion and fusion load without the embedding model
+    from app.retrieval.embedding_engine import embed_chunks
+
+    variants = expand_question(question)
+    vectors = embed_chunks(variants)  # one encode call for every variant
+    with _cache_lock:
+        _expansion_cache[key] = (variants, vectors)
+    return variants, vectors
+
+
+def clear_expansion_cache():
+    with _cache_lock:
+        _expansion_cache.clear()
+
+
+# === Batched Search + Fusion ===
+def fused_search(
+    index: faiss.Index, query_vectors: np.ndarray, top_k: int, rrf_k: int = 60
+) -> Tuple[List[int], List[float]]:
+    """
+    Searches every query vector in a single FAISS call and merges the ranked
+    lists with reciprocal rank fusion.
+
+    Returns:
+        Tuple[List[int], List[float]]: Up to `top_k` chunk ids in fused order,
+        with each chunk's best similarity across the variants.
+    """
+    fetch_k = min(top_k * 2, index.ntotal)
+    if fetch_k <= 0:
+        return [], []
+
+    with stage_timer("retrieval"):
+        distances, ids = index.search(query_vectors, fetch_k)
+    similarities = l2_to_similarity(distances)
+
+    fused: Dict[int, float] = {}
+    best: Dict[int, float] = {}
+    for row_ids, row_sims in zip(ids, similarities):
+        for rank, (chunk_id, sim) in enumerate(zip(row_ids, row_sims)):
+            if chunk_id < 0:
+                continue
+            chunk_id = int(chunk_id)
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+            best[chunk_id] = max(best.get(chunk_id, -1.0), float(sim))
+
+    ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+    return ranked, [best[i] for i in ranked]
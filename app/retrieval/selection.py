@@ -0,0 +1,69 @@
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.app_config import settings
+
+# Rough English tokens-per-word ratio for budget estimates
+TOKENS_PER_WORD = 1.3
+
+
+def l2_to_similarity(distances: np.ndarray) -> np.ndarray:
+    """
+    bge embeddings are unit-normalised, so squared L2 distance d maps to
+    cosine similarity as 1 - d / 2.
+    """
+    return 1.0 - distances / 2.0
+
+
+def select_adaptive(
+    ids: Sequence[int],
+    scores: Sequence[float],
+    word_count: Callable[[int], int],
+    min_k: int = settings.ADAPTIVE_MIN_K,
+    max_k: int = settings.ADAPTIVE_MAX_K,
+    min_score: float = settings.ADAPTIVE_MIN_SCORE,
+    max_gap: float = settings.ADAPTIVE_MAX_GAP,
+    top_margin: float = settings.ADAPTIVE_TOP_MARGIN,
+    token_budget: int = settings.CONTEXT_TOKEN_BUDGET,
+) -> List[Tuple[int, float]]:
+    """
+    Picks how many of an over-fetched, best-first result list to keep.
+
+    After the first `min_k` hits, stops at the first hit that falls below
+    `min_score`, drops more than `max_gap` below the previous hit, or more
+    than `top_margin` below the best hit. Never exceeds `max_k` hits or
+    `token_budget` estimated prompt tokens (the first hit is always kept).
+
+    Returns:
+        List[Tuple[int, float]]: (chunk id, score) pairs to use as context.
+    """
+    selected: List[Tuple[int, float]] = []
+    tokens = 0.0
+    top_score = None
+    prev_score = None
+
+    for chunk_id, score in zip(ids, scores):
+        chunk_id, score = int(chunk_id), float(score)
+        if chunk_id < 0:
+            break
+        if top_score is None:
+            top_score = score
+
+        if len(selected) >= min_k:
+            if score < min_score or top_score - score > top_margin:
+                break
+            if prev_score is not None and prev_score - score > max_gap:
+                break
+
+        cost = word_count(chunk_id) * TOKENS_PER_WORD
+        if selected and tokens + cost > token_budget:
+            break
+
+        selected.append((chunk_id, score))
+        tokens += cost
+        prev_score = score
+        if len(selected) >= max_k:
+            break
+
+    return selected
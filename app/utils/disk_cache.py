@@ -0,0 +1,52 @@
+import hashlib
+import logging
+import pickle
+from pathlib import Path
+from typing import Any, Optional
+
+from app.utils.file_lock import atomic_write_bytes
+from app.utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Pickle-per-key cache on local disk, shared by every worker process.
+
+    Writes are atomic (temp file + rename), so readers never need a lock and
+    concurrent writers of the same key simply last-write-win.
+    """
+
+    def __init__(self, directory: Path, name: str):
+        self.directory = Path(directory) / name
+        self.name = name
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.pkl"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            record_cache(self.name, False)
+            return None
+        except Exception as e:
+            logger.warning(f"[CACHE] Dropping unreadable {self.name} entry: {e}")
+            path.unlink(missing_ok=True)
+            record_cache(self.name, False)
+            return None
+        record_cache(self.name, True)
+        return value
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(path, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            logger.warning(f"[CACHE] Could not write {self.name} entry: {e}")
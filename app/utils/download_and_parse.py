@@ -1,32 +1,27 @@
-import os
-import requests
-import fitz  # PyMuPDF
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+
+from app.parsers.file_parser import parse_pdf_tiered
 from app.utils.text_splitter import split_text_into_chunks_with_metadata
+from app.utils.http_fetcher import DocumentFetcher, fetcher
+from app.utils.metrics import stage_timer
 
-def download_and_parse_pdf(url: str, chunk_size: int = 500, chunk_overlap: int = 50, source_name: str = "remote.pdf"):
+
+def parse_pdf_file(file_path, chunk_size: int = 500, chunk_overlap: int = 50, source_name: str = "remote.pdf"):
     """
-    Downloads a PDF from the given URL, extracts text, and splits into chunks with metadata.
+    Extracts text from a local PDF and splits it into chunks with metadata.
     Returns chunks and metadata separately.
     """
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise ValueError(f"Failed to download PDF, status code: {response.status_code}")
-
-    temp_pdf_path = "temp.pdf"
-    try:
-        with open(temp_pdf_path, "wb") as f:
-            f.write(response.content)
+    # PyMuPDF first, OCR only for pages without a text layer
+    with stage_timer("parse"):
+        full_text = parse_pdf_tiered(str(file_path))
 
-        doc = fitz.open(temp_pdf_path)
-        full_text = ""
-        for page in doc:
-            full_text += page.get_text()
-        doc.close()
+    if not full_text.strip():
+        raise ValueError("No text extracted from PDF")
 
-        if not full_text.strip():
-            raise ValueError("No text extracted from PDF")
-
-        # ✅ Use metadata-aware splitting
+    # ✅ Use metadata-aware splitting
+    with stage_timer("chunk"):
         chunks, metadata = split_text_into_chunks_with_metadata(
             full_text,
             chunk_size=chunk_size,
@@ -34,8 +29,36 @@ def download_and_parse_pdf(url: str, chunk_size: int = 500, chunk_overlap: int =
             source_name=source_name
         )
 
-        return chunks, metadata
+    return chunks, metadata
+
+
+async def download_and_parse_pdf_async(url: str, chunk_size: int = 500, chunk_overlap: int = 50, source_name: str = "remote.pdf"):
+    """
+    Downloads a PDF from the given URL through the shared fetcher, extracts
+    text, and splits into chunks with metadata.
+    Returns chunks and metadata separately.
+    """
+    with stage_timer("download"):
+        document = await fetcher.fetch(url)
+
+    return await run_in_threadpool(parse_pdf_file, document.path, chunk_size, chunk_overlap, source_name)
+
+
+def download_and_parse_pdf(url: str, chunk_size: int = 500, chunk_overlap: int = 50, source_name: str = "remote.pdf"):
+    """
+    Blocking variant for callers outside an event loop. Uses a short-lived
+    client (the shared one is bound to the server's loop) over the same
+    on-disk HTTP cache.
+    Returns chunks and metadata separately.
+    """
+    async def fetch():
+        one_off = DocumentFetcher()
+        try:
+            return await one_off.fetch(url)
+        finally:
+            await one_off.aclose()
+
+    with stage_timer("download"):
+        document = asyncio.run(fetch())
 
-    finally:
-        if os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
+    return parse_pdf_file(document.path, chunk_size, chunk_overlap, source_name)
@@ -0,0 +1,68 @@
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Union
+
+
+@contextmanager
+def file_lock(lock_path: Union[str, Path], shared: bool = False):
+    """
+    Advisory inter-process lock (flock) on `lock_path`.
+
+    Writers take an exclusive lock; readers that must not observe a
+    half-replaced file set take a shared one. Works across uvicorn workers
+    on the same host.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes):
+    """
+    Writes to a sibling temp file and renames it over `path`, so readers see
+    either the old or the new file, never a partial one.
+    """
+    path = Path(path)
+    # Unique per call: threads of one process may write the same key at once
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def try_file_lock(lock_path: Union[str, Path]):
+    """
+    Non-blocking exclusive lock; yields False (and holds nothing) when another
+    process already owns it. Used so only one worker runs periodic jobs.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
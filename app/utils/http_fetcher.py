@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from app.app_config import settings
+from app.utils.file_lock import atomic_write_bytes
+from app.utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentTooLarge(Exception):
+    """Raised when a remote document exceeds the configured byte limit."""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    path: Path
+    size: int
+    sha256: str
+    not_modified: bool
+
+
+class DocumentFetcher:
+    """
+    Async document downloader with a shared connection pool and a local
+    HTTP cache.
+
+    Bodies are streamed to disk under a byte limit. ETag / Last-Modified from
+    earlier responses are replayed as conditional headers, so an unchanged
+    document costs one 304 round trip instead of a full download.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = settings.FETCH_CACHE_DIR,
+        max_bytes: int = settings.FETCH_MAX_BYTES,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._client = client
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.FETCH_TIMEOUT_SECONDS, connect=settings.FETCH_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=settings.FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FETCH_MAX_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.bin", self.cache_dir / f"{key}.json"
+
+    def _load_meta(self, body_path: Path, meta_path: Path) -> Optional[dict]:
+        if not body_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    async def fetch(self, url: str) -> FetchResult:
+        # One download per URL at a time within this worker; the lock is
+        # dropped once nobody holds or waits on it
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        self._waiters[url] = self._waiters.get(url, 0) + 1
+        try:
+            async with lock:
+                return await self._fetch(url)
+        finally:
+            self._waiters[url] -= 1
+            if not self._waiters[url]:
+                del self._waiters[url]
+                del self._locks[url]
+
+    async def _fetch(self, url: str) -> FetchResult:
+        body_path, meta_path = self._paths(url)
+        meta = self._load_meta(body_path, meta_path)
+
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and meta:
+                record_cache("http", True)
+                os.utime(body_path, None)
+                return FetchResult(url, body_path, meta["size"], meta["sha256"], not_modified=True)
+
+            record_cache("http", False)
+            if response.status_code != 200:
+                raise ValueError(f"Failed to download document, status code: {response.status_code}")
+
+            declared = response.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise DocumentTooLarge(f"{url} declares {declared} bytes (limit {self.max_bytes})")
+
+            size, digest = await self._stream_to(response, body_path)
+            new_meta = {
+                "url": url,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "size": size,
+                "sha256": digest,
+            }
+
+        atomic_write_bytes(meta_path, json.dumps(new_meta).encode("utf-8"))
+        return FetchResult(url, body_path, size, digest, not_modified=False)
+
+    async def _stream_to(self, response: httpx.Response, dest: Path):
+        hasher = hashlib.sha256()
+        size = 0
+        part = dest.with_name(f".{dest.name}.{os.getpid()}.part")
+        try:
+            with open(part, "wb") as f:
+                async for block in response.aiter_bytes(settings.UPLOAD_CHUNK_BYTES):
+                    size += len(block)
+                    if size > self.max_bytes:
+                        raise DocumentTooLarge(f"{response.url} exceeds {self.max_bytes} bytes")
+                    hasher.update(block)
+                    f.write(block)
+            os.replace(part, dest)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+        return size, hasher.hexdigest()
+
+
+# === Shared Fetcher ===
+fetcher = DocumentFetcher()
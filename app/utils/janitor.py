@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.app_config import settings
+from app.retrieval.embedding_engine import INDEX_ROOT, LOCK_ROOT, delete_faiss_index, prune_index_aliases
+from app.utils.file_lock import try_file_lock
+from app.utils.metrics import DISK_USAGE_BYTES, JANITOR_RECLAIMED_BYTES, JANITOR_REMOVED
+from app.retrieval.pipeline import evict_index
+
+logger = logging.getLogger(__name__)
+
+# Temp files older than this are orphans from crashed writes
+STALE_TEMP_SECONDS = 3600
+
+
+@dataclass
+class Unit:
+    """One evictable item: a file, an upload batch directory, or an index pair."""
+    key: str
+    size: int
+    last_used: float
+    remove: Callable[[], int]
+
+
+def _path_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+def _remove_path(path: Path) -> int:
+    size = _path_size(path)
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+    return size
+
+
+# === Unit Listing ===
+def upload_units(upload_dir: Path) -> List[Unit]:
+    units = []
+    for entry in upload_dir.iterdir():
+        try:
+            units.append(Unit(str(entry), _path_size(entry), entry.stat().st_mtime,
+                              lambda e=entry: _remove_path(e)))
+        except FileNotFoundError:
+            continue
+    return units
+
+
+def index_units(index_root: Path) -> List[Unit]:
+    units = []
+    now = time.time()
+    for entry in index_root.iterdir():
+        try:
+            if entry.name.endswith(".tmp"):
+                # Orphaned partial write: remove outright once clearly stale
+                if now - entry.stat().st_mtime > STALE_TEMP_SECONDS:
+                    units.append(Unit(str(entry), entry.stat().st_size, 0.0,
+                                      lambda e=entry: _remove_path(e)))
+                continue
+            if entry.suffix != ".index":
+                continue
+            name = entry.stem
+            meta = index_root / f"{name}_meta.pkl"
+            size = entry.stat().st_size + (meta.stat().st_size if meta.exists() else 0)
+
+            def remove(name=name) -> int:
+                evict_index(name)
+                return delete_faiss_index(name)
+
+            units.append(Unit(name, size, entry.stat().st_mtime, remove))
+        except FileNotFoundError:
+            continue
+    return units
+
+
+def _remove_with_sidecar(path: Path) -> int:
+    # Fetched documents keep their ETag/Last-Modified in a .json next to the body
+    sidecar = path.with_suffix(".json")
+    size = _remove_path(path)
+    if sidecar.exists():
+        size += _remove_path(sidecar)
+    return size
+
+
+def cache_units(cache_dir: Path) -> List[Unit]:
+    units = []
+    for entry in cache_dir.rglob("*"):
+        if entry.suffix not in (".pkl", ".bin"):
+            continue
+        try:
+            stat = entry.stat()
+            # atime is refreshed by reads on most mounts (relatime), mtime as fallback
+            units.append(Unit(str(entry), stat.st_size, max(stat.st_atime, stat.st_mtime),
+                              lambda e=entry: _remove_with_sidecar(e)))
+        except FileNotFoundError:
+            continue
+    return units
+
+
+# === Sweep ===
+def sweep(target: str, units: List[Unit], ttl_seconds: int, quota_bytes: int) -> Dict[str, int]:
+    """
+    Removes units unused for longer than `ttl_seconds`, then evicts least
+    recently used units until the total size fits in `quota_bytes`.
+    """
+    now = time.time()
+    removed, reclaimed = 0, 0
+    survivors = []
+
+    for unit in units:
+        if now - unit.last_used > ttl_seconds:
+            try:
+                reclaimed += unit.remove()
+                removed += 1
+            except OSError as e:
+                logger.warning(f"[JANITOR] Could not remove {unit.key}: {e}")
+        else:
+            survivors.append(unit)
+
+    total = sum(u.size for u in survivors)
+    for unit in sorted(survivors, key=lambda u: u.last_used):
+        if total <= quota_bytes:
+            break
+        try:
+            freed = unit.remove()
+            reclaimed += freed
+            total -= unit.size
+            removed += 1
+        except OSError as e:
+            logger.warning(f"[JANITOR] Could not remove {unit.key}: {e}")
+
+    JANITOR_REMOVED.labels(target).inc(removed)
+    JANITOR_RECLAIMED_BYTES.labels(target).inc(reclaimed)
+    DISK_USAGE_BYTES.labels(target).set(max(total, 0))
+    return {"removed": removed, "reclaimed_bytes": reclaimed, "remaining_bytes": max(total, 0)}
+
+
+def run_janitor() -> Dict[str, Dict[str, int]]:
+    """
+    One pass over uploads, indexes and the on-disk caches. Only one worker
+    sweeps at a time; the others skip the pass.
+    """
+    with try_file_lock(Path(LOCK_ROOT) / "janitor.lock") as acquired:
+        if not acquired:
+            return {}
+        stats = {
+            "uploads": sweep("uploads", upload_units(settings.UPLOAD_DIR),
+                             settings.UPLOAD_TTL_SECONDS, settings.UPLOAD_QUOTA_BYTES),
+            "indexes": sweep("indexes", index_units(Path(INDEX_ROOT)),
+                             settings.INDEX_TTL_SECONDS, settings.INDEX_QUOTA_BYTES),
+        }
+        # Upload ids pointing at evicted indexes now 404 like any unknown id
+        prune_index_aliases()
+        if settings.CACHE_DIR.exists():
+            stats["cache"] = sweep("cache", cache_units(settings.CACHE_DIR),
+                                   settings.CACHE_TTL_SECONDS, settings.CACHE_QUOTA_BYTES)
+
+    for target, s in stats.items():
+        if s["removed"]:
+            logger.info(f"[JANITOR] {target}: removed {s['removed']}, reclaimed {s['reclaimed_bytes']} bytes")
+    return stats
+
+
+async def janitor_loop(interval_seconds: int = settings.JANITOR_INTERVAL_SECONDS):
+    while True:
+        try:
+            await asyncio.to_thread(run_janitor)
+        except Exception:
+            logger.exception("[JANITOR] Sweep failed")
+        await asyncio.sleep(interval_seconds)
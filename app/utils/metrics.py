@@ -0,0 +1,168 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With several workers, set PROMETHEUS_MULTIPROC_DIR (an empty directory) so
+# /metrics aggregates every process instead of whichever one answered.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# === Metric Definitions ===
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_LATENCY = Histogram(
+    "docqa_stage_latency_seconds",
+    "Latency of pipeline stages (download, parse, chunk, embed, index_write, index_load, retrieval, llm)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+PIPELINE_STAGE_LATENCY = Histogram(
+    "docqa_pipeline_stage_latency_seconds",
+    "Latency of QA pipeline stages (index_load, retrieve, context, generate) per strategy",
+    ["pipeline", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+HTTP_LATENCY = Histogram(
+    "docqa_http_request_duration_seconds",
+    "End-to-end HTTP request latency",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "docqa_http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+LLM_TOKENS = Counter(
+    "docqa_llm_tokens_total",
+    "LLM tokens consumed, by provider, model and kind (prompt/completion/cached_prompt)",
+    ["provider", "model", "kind"],
+)
+LLM_REQUESTS = Counter(
+    "docqa_llm_requests_total",
+    "LLM calls, by provider, model and outcome",
+    ["provider", "model", "status"],
+)
+CACHE_LOOKUPS = Counter(
+    "docqa_cache_lookups_total",
+    "Cache lookups by cache name and result (hit/miss); hit ratio = hit / (hit + miss)",
+    ["cache", "result"],
+)
+QUEUE_DEPTH = Gauge(
+    "docqa_queue_depth",
+    "Work items waiting or running in internal queues",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+
+JANITOR_RECLAIMED_BYTES = Counter(
+    "docqa_janitor_reclaimed_bytes_total",
+    "Bytes deleted by the disk janitor, by target (uploads/indexes/cache)",
+    ["target"],
+)
+JANITOR_REMOVED = Counter(
+    "docqa_janitor_removed_total",
+    "Files, upload batches or index pairs deleted by the disk janitor",
+    ["target"],
+)
+DISK_USAGE_BYTES = Gauge(
+    "docqa_disk_usage_bytes",
+    "Bytes retained after the last janitor sweep, by target",
+    ["target"],
+    multiprocess_mode="max",
+)
+
+# === Per-request Server-Timing ===
+# Holds {stage: [total_seconds, count]} for the current request; set by the
+# HTTP middleware and appended to by every stage_timer in the same context.
+_request_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar("request_timings", default=None)
+
+
+def begin_request_timing():
+    return _request_timings.set({})
+
+
+def end_request_timing(token) -> str:
+    """
+    Resets the request context and returns a Server-Timing header value.
+    """
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    parts = []
+    for stage, (total, count) in timings.items():
+        part = f"{stage};dur={total * 1000:.1f}"
+        if count > 1:
+            part += f';desc="x{count}"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def add_server_timing(stage: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+def observe_stage(stage: str, seconds: float, server_timing: bool = True):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    if server_timing:
+        add_server_timing(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+# === Recording Helpers ===
+def record_llm_usage(provider: str, model: str, usage, status: str = "success") -> int:
+    """
+    Records call outcome and token usage. `cached_prompt` counts the prompt
+    tokens the provider served from its prefix cache (a subset of `prompt`).
+
+    Returns:
+        int: Cached prompt tokens reported for this call (0 if none).
+    """
+    LLM_REQUESTS.labels(provider, model, status).inc()
+    if usage is None:
+        return 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    LLM_TOKENS.labels(provider, model, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.labels(provider, model, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+    LLM_TOKENS.labels(provider, model, "cached_prompt").inc(cached)
+    return cached
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def render_metrics():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
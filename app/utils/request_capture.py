@@ -0,0 +1,94 @@
+import os
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.app_config import settings
+from app.utils.metrics import QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = object()
+
+
+class RequestRecorder:
+    """
+    Appends captured requests to a JSONL file from a background thread.
+
+    `record` never blocks the request path: entries are queued and dropped
+    (with a warning) when the queue is full.
+    """
+
+    def __init__(self, path: Path, max_queue: int = 1000):
+        self.path = Path(path)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def record(self, entry: Dict[str, Any]):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(entry)
+            QUEUE_DEPTH.labels("capture").inc()
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"[CAPTURE] Queue full, dropped entry ({self.dropped} total)")
+
+    def close(self, timeout: float = 5.0):
+        if self._thread is not None:
+            self.queue.put(_SENTINEL)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._thread = threading.Thread(target=self._run, name="request-capture", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        # One os.write per line on an O_APPEND descriptor: every worker appends
+        # to the same file, and whole-line appends never interleave
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _SENTINEL:
+                    break
+                QUEUE_DEPTH.labels("capture").dec()
+                try:
+                    line = json.dumps(item, ensure_ascii=False) + "\n"
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"[CAPTURE] Could not serialise entry: {e}")
+                    continue
+                os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+# === Module-level Recorder ===
+recorder: Optional[RequestRecorder] = (
+    RequestRecorder(settings.CAPTURE_PATH) if settings.CAPTURE_REQUESTS else None
+)
+
+
+def capture_hackrx(documents: str, questions: List[str], index_name: str):
+    """
+    Records a HackRx payload for offline replay (benchmarks.replay_eval).
+    No-op unless CAPTURE_REQUESTS is enabled.
+    """
+    if recorder is None:
+        return
+    recorder.record({
+        "ts": time.time(),
+        "index_name": index_name,
+        "documents": documents,
+        "questions": questions,
+    })
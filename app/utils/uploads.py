@@ -0,0 +1,106 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Tuple
+
+from fastapi import UploadFile, status
+from fastapi.responses import JSONResponse
+
+from app.app_config import settings
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size cap."""
+
+
+async def stream_upload_to_disk(
+    upload: UploadFile,
+    dest: Path,
+    max_bytes: int = settings.UPLOAD_MAX_BYTES,
+) -> Tuple[int, str]:
+    """
+    Copies an upload to `dest` in fixed-size blocks, hashing as it goes, so
+    the file is never held in memory. The data lands in a `.part` file that
+    is renamed on success and removed on failure or when `max_bytes` is hit.
+
+    Returns:
+        Tuple[int, str]: Bytes written and the SHA-256 hex digest.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    part = dest.with_name(f"{dest.name}.part")
+    try:
+        with open(part, "wb") as f:
+            while True:
+                block = await upload.read(settings.UPLOAD_CHUNK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{upload.filename} exceeds {max_bytes} bytes")
+                hasher.update(block)
+                f.write(block)
+        os.replace(part, dest)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    return size, hasher.hexdigest()
+
+
+# === Request Body Cap ===
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware capping request bodies per path. Rejects on Content-Length
+    up front, and otherwise counts the raw body bytes as they arrive, so a
+    chunked upload is cut off before FastAPI's multipart parser has spooled
+    it to disk.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if not limit:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(limit, scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise UploadTooLarge(f"Upload exceeds {limit} bytes")
+            return message
+
+        async def guarded_send(message):
+            # FastAPI turns body-parsing errors into a 400; replace it with 413
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            pass
+        if exceeded:
+            await self._reject(limit, scope, receive, send)
+
+    @staticmethod
+    async def _reject(limit: int, scope, receive, send):
+        response = JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"detail": f"Upload exceeds {limit} bytes"},
+        )
+        await response(scope, receive, send)
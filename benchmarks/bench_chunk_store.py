@@ -0,0 +1,137 @@
+"""
+Memory and retrieval-latency comparison: per-chunk dicts + pydantic hits
+(the pre-ChunkStore representation) vs the array-backed ChunkStore.
+
+Builds a synthetic corpus of `--chunks` chunks, then reports retained
+memory, pickled index-metadata size and load time, and the cost of turning
+`--k` search ids into hits (legacy: ChunkMetadata/SourceChunk plus a
+`split()` word count per hit; store: RetrievedChunk tuples).
+
+    python -m benchmarks.bench_chunk_store --chunks 50000
+"""
+import argparse
+import gc
+import pickle
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.models.schema import ChunkMetadata, SourceChunk
+from app.retrieval.chunk_store import ChunkStore
+from benchmarks.common import percentile
+
+VOCABULARY = (
+    "policy insured premium claim coverage hospital treatment benefit waiting period "
+    "exclusion sum deductible renewal grace maternity surgery room rent co-payment "
+    "pre-existing disease network provider cashless reimbursement notice days year"
+).split()
+
+
+def synthetic_chunks(n: int, words: int, sources: int, seed: int = 7):
+    rng = random.Random(seed)
+    texts, metadata = [], []
+    for i in range(n):
+        texts.append(" ".join(rng.choice(VOCABULARY) for _ in range(words)))
+        start = i * words
+        metadata.append({
+            "source": f"policy_{i % sources}.pdf",
+            "chunk_index": i // sources,
+            "char_range": f"{start}-{start + words}",
+            "word_count": words,
+        })
+    return texts, metadata
+
+
+def legacy_hits(texts, ids, scores):
+    # Equivalent of the old embedding_engine.chunks_from_ids
+    results = []
+    for rank, i in enumerate(ids):
+        if 0 <= i < len(texts):
+            meta = ChunkMetadata(
+                chunk_index=i,
+                source=None,
+                page=None,
+                word_count=len(texts[i].split()),
+                score=float(scores[rank]),
+            )
+            results.append(SourceChunk(content=texts[i], metadata=meta.dict()))
+    return results
+
+
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def load_seconds(blob: bytes, restore, repeats: int = 5) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        restore(pickle.loads(blob))
+        samples.append(time.perf_counter() - start)
+    return percentile(samples, 50)
+
+
+def run(args):
+    texts, metadata = synthetic_chunks(args.chunks, args.chunk_words, args.sources)
+
+    # Copies so each representation owns (and is charged for) its own strings
+    legacy, legacy_mem = retained_bytes(
+        lambda: ([t.encode().decode() for t in texts], [dict(m) for m in metadata])
+    )
+    store, store_mem = retained_bytes(lambda: ChunkStore.from_chunks(texts, metadata))
+
+    legacy_blob = pickle.dumps({"texts": legacy[0], "meta": legacy[1]}, protocol=pickle.HIGHEST_PROTOCOL)
+    store_blob = pickle.dumps(store.to_state(), protocol=pickle.HIGHEST_PROTOCOL)
+
+    rng = np.random.default_rng(args.seed)
+    queries = [
+        (rng.integers(0, args.chunks, args.k), np.sort(rng.random(args.k))[::-1])
+        for _ in range(args.queries)
+    ]
+    latency = {"legacy": [], "store": []}
+    for ids, scores in queries:
+        start = time.perf_counter()
+        legacy_hits(legacy[0], ids, scores)
+        latency["legacy"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        store.hits(ids, scores)
+        latency["store"].append(time.perf_counter() - start)
+
+    rows = {
+        "legacy": (legacy_mem, len(legacy_blob), load_seconds(legacy_blob, lambda s: s)),
+        "store": (store_mem, len(store_blob), load_seconds(store_blob, ChunkStore.from_state)),
+    }
+    print(f"{args.chunks} chunks x {args.chunk_words} words, {args.sources} sources, k={args.k}")
+    print(f"{'layout':<10}{'memory MB':>12}{'pickle MB':>12}{'load ms':>10}{'hits p50 us':>14}{'hits p95 us':>14}")
+    for name, (mem, size, load) in rows.items():
+        print(
+            f"{name:<10}{mem / 2 ** 20:>12.1f}{size / 2 ** 20:>12.1f}{load * 1000:>10.1f}"
+            f"{percentile(latency[name], 50) * 1e6:>14.1f}{percentile(latency[name], 95) * 1e6:>14.1f}"
+        )
+
+    # Old pickles must still load into the new layout
+    assert len(ChunkStore.from_state(pickle.loads(legacy_blob))) == args.chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--chunk-words", type=int, default=200)
+    parser.add_argument("--sources", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Offline end-to-end pipeline benchmark.
+
+Generates a synthetic policy corpus, runs every document through
+parse_document -> index_document -> answer_questions against the local LLM
+stub, and reports p50/p95/p99 and throughput per stage. Indexes and caches
+live in a temp dir with the embedding and answer caches off, so every run
+measures the same uncached work.
+
+    python -m benchmarks.bench_pipeline --docs 10 --latency-ms 300
+    python -m benchmarks.bench_pipeline --save-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from benchmarks.common import (
+    DEFAULT_BASELINE,
+    ServerThread,
+    compare_to_baseline,
+    configure_stub_env,
+    isolated_state_env,
+    print_table,
+    save_baseline,
+    summarize,
+)
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_llm import create_stub_app
+
+SECTION = "pipeline"
+
+
+def run(args) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = generate_corpus(Path(tmp), args.docs, args.filler)
+        stub_app = create_stub_app(args.latency_ms, args.jitter_ms)
+
+        with ServerThread(stub_app) as stub:
+            configure_stub_env(stub.url)
+            os.environ.update(isolated_state_env(Path(tmp) / "state"))
+
+            # Imported late so settings and clients pick up the stub URLs
+            from app.parsers.file_parser import parse_document
+            from app.retrieval.embedding_engine import index_document
+            from app.retrieval.search_engine import answer_questions
+
+            samples = {"parse": [], "index": [], "answer": [], "document": []}
+            run_start = time.perf_counter()
+            for doc in corpus:
+                doc_start = time.perf_counter()
+
+                start = time.perf_counter()
+                chunks, metadata = parse_document(doc["path"])
+                samples["parse"].append(time.perf_counter() - start)
+
+                index_name = f"bench_{uuid.uuid4().hex[:8]}"
+                start = time.perf_counter()
+                index_document(chunks, index_name=index_name, metadata=metadata, save_index=True)
+                samples["index"].append(time.perf_counter() - start)
+
+                for question in doc["questions"][: args.questions]:
+                    start = time.perf_counter()
+                    answer_questions([question], index_name=index_name)
+                    samples["answer"].append(time.perf_counter() - start)
+
+                samples["document"].append(time.perf_counter() - doc_start)
+            wall = time.perf_counter() - run_start
+
+            llm_calls = stub_app.state.calls
+
+    # Throughput is per second of the whole run, not 1 / mean stage latency
+    results = {stage: summarize(values, wall) for stage, values in samples.items()}
+    print_table(results)
+    print(f"[BENCH] LLM calls: {llm_calls}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"results": results, "llm_calls": llm_calls}, indent=2))
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, SECTION)
+        return 0
+
+    regressions = compare_to_baseline(results, args.baseline, SECTION, args.tolerance)
+    for message in regressions:
+        print(f"[REGRESSION] {message}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=5, help="Questions asked per document")
+    parser.add_argument("--filler", type=int, default=6)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, default=None, help="Write raw results to this file")
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
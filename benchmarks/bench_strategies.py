@@ -0,0 +1,93 @@
+"""
+Compare QA pipeline strategies on per-stage latency and LLM calls.
+
+Indexes a synthetic corpus once, then runs every question through each
+registered strategy against the local LLM stub, collecting stage timings
+through the pipeline hooks. Query-embedding and answer caches are off and
+the query-expansion cache is cleared before each strategy, so no strategy
+gets hits from one that ran before it.
+
+    python -m benchmarks.bench_strategies --strategies rag_llm rag refine map_reduce --reference rag_llm
+"""
+import argparse
+import os
+import tempfile
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks.common import ServerThread, configure_stub_env, isolated_state_env, percentile
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_llm import create_stub_app
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = generate_corpus(Path(tmp), args.docs, args.filler)
+        stub_app = create_stub_app(args.latency_ms, args.jitter_ms)
+
+        with ServerThread(stub_app) as stub:
+            configure_stub_env(stub.url)
+            os.environ.update(isolated_state_env(Path(tmp) / "state"))
+            from app.parsers.file_parser import parse_document
+            from app.retrieval.embedding_engine import index_document
+            from app.retrieval.pipeline import PIPELINES, cache_index
+            from app.retrieval.query_expansion import clear_expansion_cache
+
+            strategies = args.strategies or list(PIPELINES)
+            indexed = []
+            for doc in corpus:
+                chunks, metadata = parse_document(doc["path"])
+                name = f"bench_{uuid.uuid4().hex[:8]}"
+                cache_index(name, index_document(chunks, index_name=name, metadata=metadata, save_index=True))
+                indexed.append((name, doc["questions"][: args.questions]))
+
+            rows = []
+            for strategy in strategies:
+                pipeline = PIPELINES[strategy]
+                stage_samples = defaultdict(list)
+                pipeline.add_hook(lambda _, stage, secs: stage_samples[stage].append(secs))
+                clear_expansion_cache()
+
+                questions, llm_calls = 0, 0
+                for name, doc_questions in indexed:
+                    result = pipeline.run(doc_questions, index_name=name)
+                    questions += len(doc_questions)
+                    llm_calls += result.llm_calls
+
+                pipeline.hooks.pop()
+                rows.append((strategy, questions, llm_calls, dict(stage_samples)))
+
+    calls_per_q = {strategy: calls / max(questions, 1) for strategy, questions, calls, _ in rows}
+    reference = calls_per_q.get(args.reference)
+
+    stages = ["retrieve", "context", "generate"]
+    header = (
+        f"{'strategy':<12}{'LLM calls/q':>12}{'saved/q':>9}"
+        + "".join(f"{s + ' p50':>14}{s + ' p95':>14}" for s in stages)
+    )
+    print(header)
+    print("-" * len(header))
+    for strategy, questions, llm_calls, samples in rows:
+        saved = f"{reference - calls_per_q[strategy]:>9.2f}" if reference is not None else f"{'-':>9}"
+        line = f"{strategy:<12}{calls_per_q[strategy]:>12.2f}{saved}"
+        for stage in stages:
+            values = samples.get(stage, [])
+            line += f"{percentile(values, 50) * 1000:>14.1f}{percentile(values, 95) * 1000:>14.1f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategies", nargs="*", default=None, help="Defaults to every registered strategy")
+    parser.add_argument("--reference", default="rag_llm", help="Strategy that LLM calls saved are measured against")
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--filler", type=int, default=6)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import uvicorn
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+# === Environment ===
+def configure_stub_env(stub_url: str, auth_token: str = "bench-token"):
+    """
+    Points every LLM client at the stub server. Must run before any `app.*`
+    import, because settings and SDK clients are created at import time.
+    """
+    os.environ["GROQ_BASE_URL"] = stub_url
+    os.environ["OPENAI_BASE_URL"] = f"{stub_url}/v1"
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+    os.environ.setdefault("API_AUTH_TOKEN", auth_token)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def isolated_state_env(root: Path) -> Dict[str, str]:
+    """
+    Settings that keep a benchmark run's indexes, fetched documents and
+    caches under `root`, with the query-embedding and answer caches off, so
+    repeated runs (and worker counts) measure the pipeline, not cache hits.
+    """
+    return {
+        "INDEX_ROOT": str(root / "vector_indexes"),
+        "CACHE_DIR": str(root / "cache"),
+        "FETCH_CACHE_DIR": str(root / "cache" / "http"),
+        "UPLOAD_DIR": str(root / "uploads"),
+        "EMBEDDING_CACHE": "False",
+        "ANSWER_CACHE": "False",
+    }
+
+
+# === Background Uvicorn Server ===
+class ServerThread:
+    """
+    Runs an ASGI app with uvicorn in a daemon thread for the duration of a benchmark.
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port or free_port(host)
+        config = uvicorn.Config(app, host=self.host, port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.time() + 15
+        while not self.server.started:
+            if time.time() > deadline:
+                raise RuntimeError(f"Server on {self.url} did not start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def free_port(host: str) -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+# === Statistics ===
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile; returns 0.0 for an empty sample.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float], wall_time: Optional[float] = None) -> Dict[str, float]:
+    summary = {
+        "count": len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+    }
+    if wall_time:
+        summary["throughput"] = len(samples) / wall_time
+    return summary
+
+
+def print_table(results: Dict[str, Dict[str, float]], unit: str = "ms"):
+    scale = 1000 if unit == "ms" else 1
+    print(f"{'stage':<16}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'ops/s':>10}")
+    for stage, s in results.items():
+        print(
+            f"{stage:<16}{s['count']:>8}"
+            f"{s['p50'] * scale:>10.1f}{s['p95'] * scale:>10.1f}{s['p99'] * scale:>10.1f}"
+            f"{s.get('throughput', 0.0):>10.2f}"
+        )
+
+
+# === Baseline Regression Check ===
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline_path: Path,
+    section: str,
+    tolerance: float,
+) -> List[str]:
+    """
+    Compares p95 latency (and throughput, when present) against a stored
+    baseline section. Returns human-readable regression messages.
+    """
+    if not baseline_path.exists():
+        print(f"[BENCH] No baseline at {baseline_path}; skipping regression check.")
+        return []
+
+    baseline = json.loads(baseline_path.read_text()).get(section, {})
+    regressions = []
+    for stage, current in results.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        if base["p95"] and current["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: p95 {current['p95'] * 1000:.1f}ms > baseline {base['p95'] * 1000:.1f}ms"
+            )
+        if base.get("throughput") and current.get("throughput", 0.0) < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: throughput {current['throughput']:.2f}/s < baseline {base['throughput']:.2f}/s"
+            )
+    return regressions
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], baseline_path: Path, section: str):
+    data = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    data[section] = results
+    baseline_path.write_text(json.dumps(data, indent=2, sort_keys=True))
+    print(f"[BENCH] Baseline '{section}' written to {baseline_path}")
@@ -0,0 +1,113 @@
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+from docx import Document
+
+# === Policy Vocabulary ===
+SECTIONS = [
+    ("Waiting Period", "Pre-existing diseases are covered after a waiting period of {months} months of continuous coverage."),
+    ("Grace Period", "A grace period of {days} days is allowed for premium payment without loss of continuity benefits."),
+    ("Maternity", "Maternity expenses are covered after {months} months, limited to {count} deliveries during the policy period."),
+    ("Room Rent", "Room rent is capped at {pct}% of the sum insured per day, and ICU charges at {pct2}% per day."),
+    ("Cataract", "Cataract surgery has a waiting period of {years} years and is limited to Rs. {amount} per eye."),
+    ("No Claim Discount", "A no claim discount of {pct}% on the base premium is offered on renewal for each claim-free year."),
+    ("Health Check-up", "Preventive health check-ups are reimbursed at the end of every block of {years} continuous policy years."),
+    ("AYUSH", "In-patient AYUSH treatment is covered up to the sum insured in an AYUSH hospital."),
+    ("Organ Donor", "Medical expenses for harvesting an organ for the insured person are covered."),
+    ("Exclusions", "Cosmetic surgery, self-inflicted injury and experimental treatment are excluded from coverage."),
+]
+QUESTIONS = {
+    "Waiting Period": "What is the waiting period for pre-existing diseases?",
+    "Grace Period": "What is the grace period for premium payment?",
+    "Maternity": "Does this policy cover maternity expenses?",
+    "Room Rent": "Are there any sub-limits on room rent and ICU charges?",
+    "Cataract": "What is the waiting period for cataract surgery?",
+    "No Claim Discount": "What is the No Claim Discount offered?",
+    "Health Check-up": "Is there a benefit for preventive health check-ups?",
+    "AYUSH": "What is the extent of coverage for AYUSH treatments?",
+    "Organ Donor": "Does the policy cover organ donor expenses?",
+    "Exclusions": "What treatments are excluded from coverage?",
+}
+FILLER = (
+    "The insured person shall comply with all terms and conditions of this policy. "
+    "Claims must be notified to the company within the stipulated time, along with all supporting documents. "
+    "The company reserves the right to verify every claim and to seek additional information where necessary. "
+)
+
+
+def _policy_text(rng: random.Random, filler_paragraphs: int) -> List[Dict[str, str]]:
+    sections = []
+    for title, template in SECTIONS:
+        body = template.format(
+            months=rng.choice([24, 36, 48]),
+            days=rng.choice([15, 30]),
+            count=rng.choice([1, 2]),
+            pct=rng.choice([1, 2, 5]),
+            pct2=rng.choice([2, 5]),
+            years=rng.choice([2, 3]),
+            amount=rng.choice([40000, 50000, 60000]),
+        )
+        filler = " ".join(FILLER for _ in range(rng.randint(1, filler_paragraphs)))
+        sections.append({"title": title, "answer": body, "text": f"{body} {filler}"})
+    return sections
+
+
+def _write_pdf(path: Path, sections: List[Dict[str, str]]):
+    doc = fitz.open()
+    for section in sections:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"{section['title']}\n\n{section['text']}", fontsize=10)
+    doc.save(str(path))
+    doc.close()
+
+
+def _write_docx(path: Path, sections: List[Dict[str, str]]):
+    doc = Document()
+    for section in sections:
+        doc.add_heading(section["title"], level=2)
+        doc.add_paragraph(section["text"])
+    doc.save(str(path))
+
+
+def generate_corpus(out_dir: Path, num_docs: int = 10, filler_paragraphs: int = 6, seed: int = 7) -> List[Dict]:
+    """
+    Writes `num_docs` synthetic policy documents (alternating PDF/DOCX) and a
+    manifest.json with the questions and expected answer spans for each.
+
+    Returns:
+        List[Dict]: One entry per document with path, questions and labels.
+    """
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = []
+
+    for i in range(num_docs):
+        sections = _policy_text(rng, filler_paragraphs)
+        ext = ".pdf" if i % 2 == 0 else ".docx"
+        path = out_dir / f"policy_{i:03d}{ext}"
+        (_write_pdf if ext == ".pdf" else _write_docx)(path, sections)
+
+        manifest.append({
+            "path": str(path),
+            "questions": [QUESTIONS[s["title"]] for s in sections],
+            "labels": [s["answer"] for s in sections],
+        })
+
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic policy corpus")
+    parser.add_argument("--out", type=Path, default=Path("bench_corpus"))
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--filler", type=int, default=6, help="Max filler paragraphs per section")
+    args = parser.parse_args()
+
+    docs = generate_corpus(args.out, args.docs, args.filler)
+    print(f"[CORPUS] Wrote {len(docs)} documents to {args.out}")
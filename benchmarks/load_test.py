@@ -0,0 +1,136 @@
+"""
+Concurrent load test for /api/v1/hackrx/run.
+
+Starts the LLM stub (which also serves the synthetic PDFs) and the DocQA app
+in-process with indexes and caches in a temp dir, warms up by indexing each
+document once, then fires `--requests` HackRx calls with `--concurrency` in
+flight and reports latency percentiles, throughput and errors.
+
+    python -m benchmarks.load_test --concurrency 8 --requests 40
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import (
+    DEFAULT_BASELINE,
+    ServerThread,
+    compare_to_baseline,
+    configure_stub_env,
+    isolated_state_env,
+    print_table,
+    save_baseline,
+    summarize,
+)
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_llm import create_stub_app
+
+SECTION = "load"
+AUTH_TOKEN = "bench-token"
+
+
+async def drive(app_url: str, payloads, concurrency: int, timeout: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+    headers = {"Authorization": f"Bearer {AUTH_TOKEN}"}
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout) as client:
+        async def one(payload):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/api/v1/hackrx/run", json=payload, headers=headers)
+                    if response.status_code != 200:
+                        errors.append(f"HTTP {response.status_code}")
+                        return
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError as e:
+                    errors.append(str(e))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(p) for p in payloads))
+        wall = time.perf_counter() - start
+
+    return latencies, errors, wall
+
+
+def warmup_payloads(payloads):
+    """One single-question request per distinct document."""
+    seen = {}
+    for payload in payloads:
+        seen.setdefault(payload["documents"], {**payload, "questions": payload["questions"][:1]})
+    return list(seen.values())
+
+
+def run(args) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp)
+        corpus = [d for d in generate_corpus(corpus_dir, args.docs, args.filler) if d["path"].endswith(".pdf")]
+        stub_app = create_stub_app(args.latency_ms, args.jitter_ms, docs_dir=corpus_dir)
+
+        with ServerThread(stub_app) as stub:
+            configure_stub_env(stub.url, AUTH_TOKEN)
+            os.environ.update(isolated_state_env(Path(tmp) / "state"))
+            from app.main import app  # imported after the stub env is set
+
+            payloads = [
+                {
+                    "documents": f"{stub.url}/files/{Path(doc['path']).name}",
+                    "questions": doc["questions"][: args.questions],
+                }
+                for doc in (corpus[i % len(corpus)] for i in range(args.requests))
+            ]
+
+            with ServerThread(app) as server:
+                # Index every document once so the measured requests all see
+                # the same (warm) state
+                asyncio.run(drive(server.url, warmup_payloads(payloads), args.concurrency, args.timeout))
+                latencies, errors, wall = asyncio.run(
+                    drive(server.url, payloads, args.concurrency, args.timeout)
+                )
+
+    results = {"hackrx_run": summarize(latencies, wall)}
+    print_table(results)
+    print(f"[LOAD] concurrency={args.concurrency} requests={args.requests} errors={len(errors)}")
+    for message in errors[:5]:
+        print(f"[LOAD ERROR] {message}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"results": results, "errors": errors}, indent=2))
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, SECTION)
+        return 1 if errors else 0
+
+    regressions = compare_to_baseline(results, args.baseline, SECTION, args.tolerance)
+    for message in regressions:
+        print(f"[REGRESSION] {message}")
+    return 1 if regressions or errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--filler", type=int, default=6)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, default=None)
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
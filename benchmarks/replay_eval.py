@@ -0,0 +1,233 @@
+"""
+Replay captured question sets and compare retrieval configurations on
+quality and speed together.
+
+Input is either the capture log written when CAPTURE_REQUESTS is enabled
+(one JSON object per line with "documents" and "questions") or a corpus
+manifest from benchmarks.corpus. Records may carry "labels": one expected
+answer span (or null) per question; labelled questions contribute to
+recall@k and MRR, all questions contribute to latency.
+
+    python -m benchmarks.replay_eval --input captures/requests.jsonl \\
+        --index-types flat hnsw --top-k 3 5 10 --chunk-sizes 300 500 --overlaps 50
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.common import percentile
+
+
+# === Input Loading ===
+def load_records(path: Path) -> List[Dict]:
+    text = path.read_text(encoding="utf-8").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def group_by_document(records: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    Collects (question, label) pairs per document, de-duplicating questions.
+    """
+    grouped: Dict[str, Dict[str, Optional[str]]] = {}
+    for record in records:
+        document = record.get("documents") or record.get("path")
+        labels = record.get("labels") or [None] * len(record["questions"])
+        questions = grouped.setdefault(document, {})
+        for question, label in zip(record["questions"], labels):
+            if questions.get(question) is None:
+                questions[question] = label
+    return {
+        doc: [{"question": q, "label": l} for q, l in qs.items()]
+        for doc, qs in grouped.items()
+    }
+
+
+def fetch_text(document: str, workdir: Path) -> str:
+    from app.parsers.file_parser import extract_text
+    from app.utils.http_fetcher import DocumentFetcher
+
+    if re.match(r"^https?://", document):
+        async def fetch():
+            fetcher = DocumentFetcher()
+            try:
+                return await fetcher.fetch(document)
+            finally:
+                await fetcher.aclose()
+
+        # Same size limit and conditional-GET cache as the server
+        fetched = asyncio.run(fetch())
+        # Cached bodies are stored as .bin; the parser dispatches on extension
+        suffix = Path(document.split("?")[0]).suffix or ".pdf"
+        local = workdir / f"{fetched.sha256[:16]}{suffix}"
+        shutil.copyfile(fetched.path, local)
+        return extract_text(str(local))
+    return extract_text(document)
+
+
+# === Relevance ===
+def _normalise(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def relevant_chunks(chunks: List[str], label: str) -> set:
+    """
+    Chunks containing the labelled span; if the span straddles a boundary,
+    the chunks covering at least half of its words.
+    """
+    span = _normalise(label)
+    exact = {i for i, chunk in enumerate(chunks) if span in _normalise(chunk)}
+    if exact:
+        return exact
+    span_words = set(span.split())
+    partial = set()
+    for i, chunk in enumerate(chunks):
+        overlap = len(span_words & set(_normalise(chunk).split()))
+        if span_words and overlap / len(span_words) >= 0.5:
+            partial.add(i)
+    return partial
+
+
+# === Evaluation ===
+def evaluate(documents: Dict[str, Dict], args) -> List[Dict]:
+    from app.app_config import settings
+    from app.retrieval.embedding_engine import build_faiss_index, embed_chunks, l2_to_similarity
+    from app.retrieval.selection import TOKENS_PER_WORD, select_adaptive
+    from app.utils.text_splitter import split_text_into_chunks_with_metadata
+
+    # Query embeddings do not depend on the chunking, so embed them once
+    query_vecs, query_latency = {}, []
+    for doc in documents.values():
+        for item in doc["items"]:
+            start = time.perf_counter()
+            query_vecs[item["question"]] = embed_chunks([item["question"]])
+            query_latency.append(time.perf_counter() - start)
+
+    rows = []
+    for chunk_size, overlap in itertools.product(args.chunk_sizes, args.overlaps):
+        split = {}
+        embed_time, chunk_count = 0.0, 0
+        for name, doc in documents.items():
+            chunks, _ = split_text_into_chunks_with_metadata(doc["text"], chunk_size=chunk_size, overlap=overlap)
+            start = time.perf_counter()
+            embeddings = embed_chunks(chunks)
+            embed_time += time.perf_counter() - start
+            chunk_count += len(chunks)
+            split[name] = (chunks, embeddings)
+
+        for index_type in args.index_types:
+            build_time = 0.0
+            indexes = {}
+            for name, (chunks, embeddings) in split.items():
+                start = time.perf_counter()
+                indexes[name] = build_faiss_index(embeddings, index_type)
+                build_time += time.perf_counter() - start
+
+            depths = list(args.top_k) + (["adapt"] if args.adaptive else [])
+            for top_k in depths:
+                search_latency, hits, reciprocal_ranks, labelled = [], 0, 0.0, 0
+                context_tokens = []
+                for name, doc in documents.items():
+                    chunks, _ = split[name]
+                    index = indexes[name]
+                    fetch_k = settings.ADAPTIVE_FETCH_K if top_k == "adapt" else top_k
+                    k = min(fetch_k, len(chunks))
+                    for item in doc["items"]:
+                        start = time.perf_counter()
+                        distances, ids = index.search(query_vecs[item["question"]], k)
+                        if top_k == "adapt":
+                            selected = select_adaptive(
+                                ids[0], l2_to_similarity(distances[0]), lambda i: len(chunks[i].split())
+                            )
+                            ranked = [i for i, _ in selected]
+                        else:
+                            ranked = [int(i) for i in ids[0] if i >= 0]
+                        search_latency.append(time.perf_counter() - start)
+                        context_tokens.append(sum(len(chunks[i].split()) for i in ranked) * TOKENS_PER_WORD)
+
+                        if not item["label"]:
+                            continue
+                        labelled += 1
+                        relevant = relevant_chunks(chunks, item["label"])
+                        for rank, chunk_id in enumerate(ranked, start=1):
+                            if chunk_id in relevant:
+                                hits += 1
+                                reciprocal_ranks += 1.0 / rank
+                                break
+
+                rows.append({
+                    "index": index_type,
+                    "chunk_size": chunk_size,
+                    "overlap": overlap,
+                    "top_k": top_k,
+                    "chunks": chunk_count,
+                    "labelled": labelled,
+                    "recall": hits / labelled if labelled else float("nan"),
+                    "mrr": reciprocal_ranks / labelled if labelled else float("nan"),
+                    "avg_context_tokens": sum(context_tokens) / max(len(context_tokens), 1),
+                    "embed_ms_per_chunk": 1000 * embed_time / max(chunk_count, 1),
+                    "build_ms": 1000 * build_time,
+                    "query_embed_p50_ms": 1000 * percentile(query_latency, 50),
+                    "search_p50_ms": 1000 * percentile(search_latency, 50),
+                    "search_p95_ms": 1000 * percentile(search_latency, 95),
+                })
+    return rows
+
+
+def print_rows(rows: List[Dict]):
+    header = (
+        f"{'index':<6}{'chunk':>6}{'ovl':>5}{'k':>6}{'chunks':>8}"
+        f"{'recall@k':>10}{'MRR':>7}{'ctx tok':>9}{'emb ms/ch':>11}{'build ms':>10}{'q-emb p50':>11}"
+        f"{'srch p50':>10}{'srch p95':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['index']:<6}{r['chunk_size']:>6}{r['overlap']:>5}{r['top_k']:>6}{r['chunks']:>8}"
+            f"{r['recall']:>10.3f}{r['mrr']:>7.3f}{r['avg_context_tokens']:>9.0f}{r['embed_ms_per_chunk']:>11.2f}{r['build_ms']:>10.1f}"
+            f"{r['query_embed_p50_ms']:>11.2f}{r['search_p50_ms']:>10.3f}{r['search_p95_ms']:>10.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, required=True, help="Capture JSONL or corpus manifest.json")
+    parser.add_argument("--index-types", nargs="+", default=["flat", "hnsw"], choices=["flat", "hnsw"])
+    parser.add_argument("--top-k", nargs="+", type=int, default=[3, 5, 10])
+    parser.add_argument("--adaptive", action="store_true", help="Also evaluate adaptive depth selection")
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=[300, 500])
+    parser.add_argument("--overlaps", nargs="+", type=int, default=[50])
+    parser.add_argument("--json", type=Path, default=None, help="Write rows to this file")
+    args = parser.parse_args()
+
+    grouped = group_by_document(load_records(args.input))
+    if not grouped:
+        raise SystemExit(f"No records in {args.input}")
+
+    documents = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for document, items in grouped.items():
+            try:
+                documents[document] = {"text": fetch_text(document, Path(tmp)), "items": items}
+            except Exception as e:
+                print(f"[REPLAY] Skipping {document}: {e}")
+
+    rows = evaluate(documents, args)
+    print_rows(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
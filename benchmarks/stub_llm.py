@@ -0,0 +1,119 @@
+import asyncio
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+
+def create_stub_app(
+    latency_ms: float = 300.0,
+    jitter_ms: float = 50.0,
+    docs_dir: Optional[Path] = None,
+) -> FastAPI:
+    """
+    OpenAI-compatible chat completions server with configurable latency.
+
+    Serves both `/v1/chat/completions` (OpenAI SDK) and
+    `/openai/v1/chat/completions` (Groq SDK), and optionally the files in
+    `docs_dir` under `/files/<name>` so HackRx runs can download documents
+    without leaving the machine. File requests honour If-None-Match /
+    If-Modified-Since and are counted in `/stats`.
+    """
+    app = FastAPI(title="DocQA benchmark LLM stub")
+    app.state.calls = 0
+    app.state.file_downloads = 0
+    app.state.file_not_modified = 0
+    app.state.system_prefixes = set()
+    app.state.cached_tokens = 0
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        messages = body.get("messages", [])
+        prompt_words = sum(len(str(m.get("content", "")).split()) for m in messages)
+
+        # Mimic provider prefix caching: a repeated system message counts as cached
+        cached_words = 0
+        if messages and messages[0].get("role") == "system":
+            system = str(messages[0].get("content", ""))
+            if system in app.state.system_prefixes:
+                cached_words = len(system.split())
+            app.state.system_prefixes.add(system)
+        app.state.cached_tokens += cached_words
+        content = "Stub answer based on the provided context."
+        completion_words = len(content.split())
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_words,
+                "completion_tokens": completion_words,
+                "total_tokens": prompt_words + completion_words,
+                "prompt_tokens_details": {"cached_tokens": cached_words},
+            },
+        }
+
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/openai/v1/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/stats")
+    def stats():
+        return {
+            "calls": app.state.calls,
+            "cached_tokens": app.state.cached_tokens,
+            "file_downloads": app.state.file_downloads,
+            "file_not_modified": app.state.file_not_modified,
+        }
+
+    if docs_dir is not None:
+        @app.get("/files/{name}")
+        def serve_doc(name: str, request: Request):
+            path = docs_dir / Path(name).name
+            if not path.is_file():
+                raise HTTPException(status_code=404)
+            response = FileResponse(path, stat_result=os.stat(path))
+
+            # Honour conditional GETs so the app's fetch cache can be exercised
+            etag = response.headers["etag"]
+            last_modified = response.headers["last-modified"]
+            if_none_match = request.headers.get("if-none-match")
+            if (if_none_match and if_none_match == etag) or (
+                not if_none_match and request.headers.get("if-modified-since") == last_modified
+            ):
+                app.state.file_not_modified += 1
+                return Response(status_code=304, headers={"etag": etag, "last-modified": last_modified})
+
+            app.state.file_downloads += 1
+            return response
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the OpenAI-compatible LLM stub")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--docs-dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    uvicorn.run(create_stub_app(args.latency_ms, args.jitter_ms, args.docs_dir), port=args.port)
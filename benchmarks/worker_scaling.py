@@ -0,0 +1,120 @@
+"""
+Throughput scaling of the multi-worker deployment from 1 to N workers.
+
+For each worker count, launches `uvicorn app.main:app --workers N` as a
+subprocess (pointed at the local LLM stub), drives /api/v1/hackrx/run with
+`--per-worker-concurrency * N` requests in flight, and reports throughput,
+latency and speed-up over a single worker. Each worker count gets its own
+index/cache directories (embedding and answer caches off) and a warm-up
+pass that indexes every document once.
+
+    python -m benchmarks.worker_scaling --workers 1 2 4 --requests 40
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import ServerThread, free_port, configure_stub_env, isolated_state_env, percentile
+from benchmarks.corpus import generate_corpus
+from benchmarks.load_test import AUTH_TOKEN, drive, warmup_payloads
+from benchmarks.stub_llm import create_stub_app
+
+
+def wait_until_ready(url: str, timeout: float):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App at {url} not ready after {timeout}s")
+
+
+def run(args):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp) / "corpus"
+        corpus = [d for d in generate_corpus(corpus_dir, args.docs) if d["path"].endswith(".pdf")]
+        stub_app = create_stub_app(args.latency_ms, args.jitter_ms, docs_dir=corpus_dir)
+
+        with ServerThread(stub_app) as stub:
+            configure_stub_env(stub.url, AUTH_TOKEN)
+            payloads = [
+                {
+                    "documents": f"{stub.url}/files/{Path(doc['path']).name}",
+                    "questions": doc["questions"][: args.questions],
+                }
+                for doc in (corpus[i % len(corpus)] for i in range(args.requests))
+            ]
+
+            for workers in args.workers:
+                metrics_dir = Path(tmp) / f"metrics_{workers}"
+                metrics_dir.mkdir()
+                env = dict(
+                    os.environ,
+                    PROMETHEUS_MULTIPROC_DIR=str(metrics_dir),
+                    **isolated_state_env(Path(tmp) / f"state_{workers}"),
+                )
+                port = free_port("127.0.0.1")
+                app_url = f"http://127.0.0.1:{port}"
+                proc = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", "app.main:app",
+                     "--host", "127.0.0.1", "--port", str(port),
+                     "--workers", str(workers), "--log-level", "warning"],
+                    env=env,
+                )
+                try:
+                    wait_until_ready(app_url, args.startup_timeout)
+                    # Fresh state per worker count: index every document once
+                    # before measuring so no run pays ingestion the others skip
+                    asyncio.run(drive(app_url, warmup_payloads(payloads), workers, args.timeout))
+                    latencies, errors, wall = asyncio.run(
+                        drive(app_url, payloads, args.per_worker_concurrency * workers, args.timeout)
+                    )
+                finally:
+                    proc.terminate()
+                    proc.wait(timeout=30)
+
+                rows.append({
+                    "workers": workers,
+                    "rps": len(latencies) / wall if wall else 0.0,
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                    "errors": len(errors),
+                })
+
+    base_rps = rows[0]["rps"] if rows and rows[0]["rps"] else None
+    print(f"{'workers':>8}{'req/s':>10}{'speed-up':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for r in rows:
+        speedup = r["rps"] / base_rps if base_rps else 0.0
+        print(
+            f"{r['workers']:>8}{r['rps']:>10.2f}{speedup:>10.2f}"
+            f"{r['p50'] * 1000:>10.1f}{r['p95'] * 1000:>10.1f}{r['errors']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--per-worker-concurrency", type=int, default=2)
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--timeout", type=float, default=180.0)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
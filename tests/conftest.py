@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Settings are read at import time: give the app a token and keep every
+# on-disk directory out of the working tree before any `app.*` import.
+_STATE_DIR = tempfile.mkdtemp(prefix="docqa-tests-")
+os.environ.setdefault("API_AUTH_TOKEN", "test-token")
+for _name in ("CACHE_DIR", "FETCH_CACHE_DIR", "INDEX_ROOT", "UPLOAD_DIR"):
+    os.environ.setdefault(_name, os.path.join(_STATE_DIR, _name.lower()))
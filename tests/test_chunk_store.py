@@ -0,0 +1,65 @@
+import pickle
+
+from app.retrieval.chunk_store import ChunkStore
+from app.utils.text_splitter import split_text_into_chunks_with_metadata
+
+TEXT = " ".join(f"wörd{i}" for i in range(250))
+
+
+def test_round_trip_preserves_texts_and_columns():
+    chunks, metadata = split_text_into_chunks_with_metadata(TEXT, chunk_size=100, overlap=20, source_name="a.pdf")
+    store = ChunkStore.from_chunks(chunks, metadata)
+
+    restored = ChunkStore.from_state(pickle.loads(pickle.dumps(store.to_state())))
+
+    assert len(restored) == len(chunks)
+    assert [restored.text(i) for i in range(len(chunks))] == chunks
+    assert restored.word_count.tolist() == [m["word_count"] for m in metadata]
+    assert restored.chunk_index.tolist() == [m["chunk_index"] for m in metadata]
+    assert restored.source(0) == "a.pdf"
+    assert restored.page_of(0) is None
+
+
+def test_sources_are_deduplicated_per_row():
+    store = ChunkStore.from_chunks(
+        ["one", "two", "three"],
+        [{"source": "a.pdf"}, {"source": "b.docx"}, {"source": "a.pdf", "page": 4}],
+    )
+    assert store.sources == ["a.pdf", "b.docx"]
+    assert [store.source(i) for i in range(3)] == ["a.pdf", "b.docx", "a.pdf"]
+    assert store.page_of(2) == 4
+
+
+def test_hits_skip_padding_and_keep_order():
+    store = ChunkStore.from_chunks(["alpha beta", "gamma", "delta epsilon zeta"])
+    hits = store.hits([2, -1, 0, 7], [0.9, -1.0, 0.5, 0.1])
+
+    assert [h.id for h in hits] == [2, 0]
+    assert hits[0].content == "delta epsilon zeta"
+    assert hits[0].word_count == 3
+    assert hits[1].score == 0.5
+    assert hits[0].to_source_chunk().metadata.chunk_index == 2
+
+
+def test_hits_report_saved_chunk_index():
+    # Batch indexes number chunks per file; the FAISS row keeps counting
+    store = ChunkStore.from_chunks(
+        ["a0", "a1", "b0"],
+        [{"source": "a.pdf", "chunk_index": 0}, {"source": "a.pdf", "chunk_index": 1}, {"source": "b.pdf", "chunk_index": 0}],
+    )
+    hit = store.hits([2])[0]
+
+    assert (hit.id, hit.chunk_index) == (2, 0)
+    assert hit.to_source_chunk().metadata.chunk_index == 0
+
+
+def test_legacy_pickle_with_short_metadata():
+    legacy = {"texts": ["a b c", "d e", "f"], "meta": [{"source": "old.pdf", "chunk_index": 0, "word_count": 3}]}
+
+    store = ChunkStore.from_state(legacy)
+
+    assert len(store) == 3
+    assert store.word_count.tolist() == [3, 2, 1]
+    assert store.chunk_index.tolist() == [0, 1, 2]
+    assert store.source(0) == "old.pdf"
+    assert store.source(2) is None
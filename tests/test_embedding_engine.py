@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from app.retrieval import embedding_engine
+from app.retrieval.embedding_engine import (
+    DocumentIndex,
+    get_top_k_chunks,
+    index_document,
+    load_faiss_index,
+)
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+class LetterCountEncoder:
+    """Tiny stand-in for the sentence-transformers model: normalised letter counts."""
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        vectors = np.array([[text.lower().count(c) for c in ALPHABET] for text in texts], dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6)
+
+
+@pytest.fixture(autouse=True)
+def fake_encoder(monkeypatch):
+    monkeypatch.setattr(embedding_engine, "_embedding_model", LetterCountEncoder())
+    monkeypatch.setattr(embedding_engine, "query_embedding_cache", None)
+
+
+def test_create_save_load_round_trip():
+    chunks = ["aaaa aaaa", "bbbb bbbb bbbb", "cccc"]
+    metadata = [{"source": "a.pdf", "chunk_index": i, "word_count": len(c.split())} for i, c in enumerate(chunks)]
+
+    created = index_document(chunks, index_name="round_trip", metadata=metadata, save_index=True)
+    loaded = load_faiss_index("round_trip")
+
+    assert isinstance(loaded, DocumentIndex)
+    assert loaded.faiss_index.ntotal == created.faiss_index.ntotal == 3
+    assert [loaded.chunk_store.text(i) for i in range(3)] == chunks
+
+    hits = get_top_k_chunks("bb", loaded, top_k=2)
+    assert hits[0].content == "bbbb bbbb bbbb"
+    assert hits[0].source == "a.pdf"
+    assert hits[0].word_count == 3
+    assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_load_missing_index():
+    with pytest.raises(FileNotFoundError):
+        load_faiss_index("never_written")
+
+
+def test_upload_alias_hides_content_index():
+    index_name = embedding_engine.content_index_name("ab" * 32)
+    index_document(["alias chunk"], index_name=index_name, metadata=[{}], save_index=True)
+    embedding_engine.write_index_alias("upload-1", index_name)
+
+    assert embedding_engine.resolve_index_name("upload-1") == index_name
+    # Batch ids and pre-alias uploads are index names themselves
+    assert embedding_engine.resolve_index_name("batch-1") == "batch-1"
+    for probe in (index_name, "../upload-1", ".locks"):
+        with pytest.raises(FileNotFoundError):
+            embedding_engine.resolve_index_name(probe)
+
+
+def test_prune_drops_aliases_of_deleted_indexes():
+    index_name = embedding_engine.content_index_name("cd" * 32)
+    index_document(["pruned chunk"], index_name=index_name, metadata=[{}], save_index=True)
+    embedding_engine.write_index_alias("upload-2", index_name)
+
+    embedding_engine.delete_faiss_index(index_name)
+
+    assert embedding_engine.prune_index_aliases() >= 1
+    with pytest.raises(FileNotFoundError):
+        embedding_engine.load_faiss_index(embedding_engine.resolve_index_name("upload-2"))
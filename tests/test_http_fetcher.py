@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from app.utils.http_fetcher import DocumentFetcher, DocumentTooLarge
+from benchmarks.stub_llm import create_stub_app
+
+BODY = b"%PDF-1.4 synthetic policy document\n" * 200
+
+
+def fetch_all(fetcher: DocumentFetcher, urls):
+    async def scenario():
+        try:
+            return [await fetcher.fetch(url) for url in urls]
+        finally:
+            await fetcher.aclose()
+    return asyncio.run(scenario())
+
+
+def mock_fetcher(tmp_path, handler, max_bytes=1024):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return DocumentFetcher(cache_dir=tmp_path / "http", max_bytes=max_bytes, client=client)
+
+
+def leftovers(tmp_path):
+    return sorted(p.name for p in (tmp_path / "http").iterdir())
+
+
+def test_repeat_fetch_is_conditional_and_reuses_body(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "policy.pdf").write_bytes(BODY)
+    stub = create_stub_app(latency_ms=0, jitter_ms=0, docs_dir=docs)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    fetcher = DocumentFetcher(cache_dir=tmp_path / "http", client=client)
+
+    first, second = fetch_all(fetcher, ["http://stub/files/policy.pdf"] * 2)
+
+    assert not first.not_modified
+    assert second.not_modified
+    assert second.path == first.path
+    assert first.sha256 == second.sha256 == hashlib.sha256(BODY).hexdigest()
+    assert first.path.read_bytes() == BODY
+    assert stub.state.file_downloads == 1
+    assert stub.state.file_not_modified == 1
+    assert fetcher._locks == {} and fetcher._waiters == {}
+
+
+def test_declared_content_length_over_limit(tmp_path):
+    fetcher = mock_fetcher(tmp_path, lambda request: httpx.Response(200, content=b"x" * 2048))
+
+    with pytest.raises(DocumentTooLarge):
+        fetch_all(fetcher, ["http://docs/big.pdf"])
+    assert leftovers(tmp_path) == []
+
+
+def test_streamed_bytes_over_limit_remove_part_file(tmp_path):
+    async def body():
+        for _ in range(4):
+            yield b"x" * 512
+
+    # No Content-Length: only the running byte count can catch it
+    fetcher = mock_fetcher(tmp_path, lambda request: httpx.Response(200, content=body()))
+
+    with pytest.raises(DocumentTooLarge):
+        fetch_all(fetcher, ["http://docs/chunked.pdf"])
+    assert leftovers(tmp_path) == []
+
+
+def test_connection_error_mid_body_removes_part_file(tmp_path):
+    async def body():
+        yield b"x" * 256
+        raise httpx.ReadError("connection reset")
+
+    fetcher = mock_fetcher(tmp_path, lambda request: httpx.Response(200, content=body()))
+
+    with pytest.raises(httpx.ReadError):
+        fetch_all(fetcher, ["http://docs/broken.pdf"])
+    assert leftovers(tmp_path) == []
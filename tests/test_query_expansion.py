@@ -0,0 +1,34 @@
+import faiss
+import numpy as np
+import pytest
+
+from app.retrieval.query_expansion import expand_question, fused_search
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_fused_search_orders_by_reciprocal_rank():
+    index = faiss.IndexFlatL2(4)
+    index.add(np.eye(4, dtype=np.float32))
+    # q1 ranks chunks 0,1,2,3 and q2 ranks 2,1,3,0: RRF puts 2 then 1 first
+    queries = np.stack([unit(0.8, 0.55, 0.1, 0.05), unit(0.05, 0.55, 0.8, 0.1)])
+
+    ids, scores = fused_search(index, queries, top_k=2)
+
+    assert ids == [2, 1]
+    # Best cosine similarity of each chunk across the query variants
+    assert scores == pytest.approx([queries[1][2], max(queries[0][1], queries[1][1])], abs=1e-5)
+
+
+def test_fused_search_on_empty_index():
+    assert fused_search(faiss.IndexFlatL2(4), np.stack([unit(1, 0, 0, 0)]), top_k=3) == ([], [])
+
+
+def test_expand_question_adds_keyword_and_statement_variants():
+    variants = expand_question("What is the waiting period for cataract surgery?")
+    assert variants[0] == "What is the waiting period for cataract surgery?"
+    assert "waiting period cataract surgery" in variants
+    assert "waiting period for cataract surgery" in variants
@@ -0,0 +1,41 @@
+import pytest
+
+from app.retrieval.selection import TOKENS_PER_WORD, select_adaptive
+
+LIMITS = dict(min_k=1, max_k=10, min_score=0.5, max_gap=0.08, top_margin=0.15, token_budget=10_000)
+
+
+def select(ids, scores, words=100, **overrides):
+    return select_adaptive(ids, scores, lambda i: words, **{**LIMITS, **overrides})
+
+
+def test_stops_at_score_gap():
+    picked = select([0, 1, 2, 3], [0.90, 0.88, 0.86, 0.70])
+    assert [i for i, _ in picked] == [0, 1, 2]
+
+
+def test_stops_beyond_top_margin():
+    # Each step is within max_gap, but the drift from the best hit is not
+    picked = select(range(6), [0.90, 0.84, 0.78, 0.72, 0.66, 0.60])
+    assert [i for i, _ in picked] == [0, 1, 2]
+
+
+def test_stops_below_min_score_but_keeps_min_k():
+    assert [i for i, _ in select([0, 1], [0.45, 0.44])] == [0]
+    assert [i for i, _ in select([0, 1], [0.45, 0.44], min_k=2)] == [0, 1]
+
+
+def test_token_budget_always_keeps_first_hit():
+    cost = 100 * TOKENS_PER_WORD
+    picked = select([0, 1, 2], [0.9, 0.9, 0.9], token_budget=int(cost * 2))
+    assert [i for i, _ in picked] == [0, 1]
+    assert len(select([0, 1], [0.9, 0.9], token_budget=1)) == 1
+
+
+def test_max_k_caps_selection():
+    assert len(select(range(20), [0.9] * 20, max_k=4)) == 4
+
+
+def test_faiss_padding_ends_selection():
+    picked = select([3, -1, -1], [0.9, -1.0, -1.0])
+    assert picked == [(3, pytest.approx(0.9))]